@@ -8,10 +8,25 @@ bl_info = {
     "category": "3D View",
 }
 
+import hashlib
+import io
+import json
+import lzma
+import os
+import struct
+import tempfile
+import zipfile
+import zlib
+
 import bpy
+import numpy as np
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
 from bpy.props import BoolProperty, IntProperty, PointerProperty
+from bpy.app.handlers import persistent
 from mathutils import Vector
 from bpy_extras import view3d_utils
+from bpy_extras.io_utils import ExportHelper, ImportHelper
 
 
 # ---------------------------- GRID FRAME ----------------------------------
@@ -138,7 +153,9 @@ class VoxelGridProps(bpy.types.PropertyGroup):
         items=[
             ('SINGLE', "Single", "Place one cube per step"),
             ('SQUARE', "Square", "Fill square area"),
-            ('CIRCLE', "Circle", "Fill circular area")
+            ('CIRCLE', "Circle", "Fill circular area"),
+            ('CUBE', "Cube", "Fill cubic volume around the cursor"),
+            ('SPHERE', "Sphere", "Fill spherical volume around the cursor"),
         ],
         default='SINGLE'
     )
@@ -148,9 +165,2088 @@ class VoxelGridProps(bpy.types.PropertyGroup):
         default=1,
         min=1,
         max=10,
-        description="Radius of brush for square or circle"
+        description="Radius of brush for square, circle, cube or sphere"
+    )
+
+    mirror_x: BoolProperty(name="X", default=False, description="Mirror brush strokes across the grid center on X")
+    mirror_y: BoolProperty(name="Y", default=False, description="Mirror brush strokes across the grid center on Y")
+    mirror_z: BoolProperty(name="Z", default=False, description="Mirror brush strokes across the grid center on Z")
+
+    boolean_operand: bpy.props.EnumProperty(
+        name="Operand",
+        items=[
+            ('CLIPBOARD', "Clipboard", "Use the voxel clipboard placed at the 3D cursor"),
+            ('COLLECTION', "Collection", "Use the voxels and voxelized meshes of a collection"),
+        ],
+        default='CLIPBOARD'
+    )
+
+    boolean_collection: PointerProperty(
+        name="Collection",
+        type=bpy.types.Collection,
+        description="Collection used as the second boolean operand"
     )
 
+    compact_storage: BoolProperty(
+        name="Compact Storage",
+        default=False,
+        description="Save voxels in the .blend as one compressed block, drawn as one mesh per chunk instead of one object per voxel",
+        update=lambda self, context: set_compact_storage(context)
+    )
+
+    memory_budget: bpy.props.IntProperty(
+        name="Memory Budget (MB)",
+        default=1024,
+        min=16,
+        description="Voxel data kept in RAM, least recently used chunks beyond this are paged out to disk"
+    )
+
+    cache_dir: bpy.props.StringProperty(
+        name="Voxelize Cache",
+        subtype='DIR_PATH',
+        default="",
+        description="Folder for cached voxelization results, empty uses the system temp folder"
+    )
+
+    cache_size: bpy.props.IntProperty(
+        name="Cache Size (MB)",
+        default=256,
+        min=0,
+        description="Disk space for cached voxelization results, least recently used are deleted first, 0 disables the cache"
+    )
+
+    undo_memory: bpy.props.IntProperty(
+        name="Undo Memory (MB)",
+        default=64,
+        min=1,
+        description="Memory cap for the voxel undo journal, oldest strokes are dropped first"
+    )
+
+
+# ------------------------------ BRUSH -------------------------------------
+
+def brush_offsets(shape_mode, radius, orientation):
+    if shape_mode == 'SINGLE':
+        return np.zeros((1, 3), dtype=np.int64)
+
+    r = np.arange(-radius, radius + 1)
+
+    # 3D brushes ignore the layer plane
+    if shape_mode in {'CUBE', 'SPHERE'}:
+        offsets = np.stack(np.meshgrid(r, r, r, indexing='ij'), axis=-1).reshape(-1, 3)
+        if shape_mode == 'SPHERE':
+            offsets = offsets[(offsets * offsets).sum(axis=1) <= radius * radius]
+        return offsets
+
+    du, dv = (a.ravel() for a in np.meshgrid(r, r, indexing='ij'))
+    if shape_mode == 'CIRCLE':
+        keep = du * du + dv * dv <= radius * radius
+        du, dv = du[keep], dv[keep]
+
+    zero = np.zeros_like(du)
+    if orientation == 'XY':
+        return np.stack((du, dv, zero), axis=1)
+    elif orientation == 'XZ':
+        return np.stack((du, zero, dv), axis=1)
+    return np.stack((zero, du, dv), axis=1)  # YZ
+
+
+def brush_cells(props, x, y, z):
+    cells = brush_offsets(props.shape_mode, props.brush_radius, props.orientation) + (x, y, z)
+    dims = np.array((props.dim_x, props.dim_y, props.dim_z))
+    cells = cells[np.all((cells >= 0) & (cells < dims), axis=1)]
+
+    # Each enabled axis reflects the whole stamp so far, giving up to 8 copies
+    for axis, enabled in enumerate((props.mirror_x, props.mirror_y, props.mirror_z)):
+        if enabled:
+            mirrored = cells.copy()
+            mirrored[:, axis] = dims[axis] - 1 - mirrored[:, axis]
+            cells = np.concatenate((cells, mirrored))
+    return cells
+
+
+# ---------------------------- VOXEL STORE ---------------------------------
+
+CHUNK_SIZE = 32
+
+COORD_BITS = 21
+COORD_MASK = (1 << COORD_BITS) - 1
+
+
+def pack_coords(coords):
+    coords = np.asarray(coords, dtype=np.int64)
+    return (coords[:, 0] << (2 * COORD_BITS)) | (coords[:, 1] << COORD_BITS) | coords[:, 2]
+
+
+def unpack_coords(keys):
+    return np.stack((keys >> (2 * COORD_BITS), (keys >> COORD_BITS) & COORD_MASK, keys & COORD_MASK), axis=1)
+
+
+class ChunkCache(MutableMapping):
+    """Chunk dict keeping at most budget chunks in memory, the rest paged out to a temp file"""
+
+    def __init__(self, budget=0):
+        self.budget = budget  # 0 keeps every chunk resident
+        self.resident = OrderedDict()
+        self.dirty = set()
+        # key -> (offset, length, encoding) of the last copy written to disk
+        self.index = {}
+        self.file = None
+        self.end = 0  # bytes used in the file
+        self.live = 0  # bytes of it still referenced by index
+
+    def __getitem__(self, key):
+        chunk = self.resident.get(key)
+        if chunk is not None:
+            self.resident.move_to_end(key)
+            return chunk
+        offset, length, encoding = self.index[key]
+        self.file.seek(offset)
+        chunk = decode_chunk(encoding, zlib.decompress(self.file.read(length)))
+        self.resident[key] = chunk
+        self.evict()
+        return chunk
+
+    def __setitem__(self, key, chunk):
+        self.resident[key] = chunk
+        self.resident.move_to_end(key)
+        self.dirty.add(key)
+        self.evict()
+
+    def __delitem__(self, key):
+        found = self.resident.pop(key, None) is not None
+        slot = self.index.pop(key, None)
+        if slot is not None:
+            self.live -= slot[1]
+        found = slot is not None or found
+        self.dirty.discard(key)
+        if not found:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.resident or key in self.index
+
+    def __iter__(self):
+        return iter(list(self.resident.keys() | self.index.keys()))
+
+    def __len__(self):
+        return len(self.resident.keys() | self.index.keys())
+
+    def evict(self):
+        # Least recently used chunks go first, written back only if edited since their last write
+        while self.budget and len(self.resident) > self.budget:
+            key, chunk = self.resident.popitem(last=False)
+            if key in self.dirty or key not in self.index:
+                self.write(key, chunk)
+            self.dirty.discard(key)
+
+    def write(self, key, chunk):
+        if self.file is None:
+            self.file = tempfile.TemporaryFile(prefix="voxel_chunks_")
+        encoding, raw = encode_chunk(chunk)
+        payload = zlib.compress(raw, 1)
+        # Overwrite the superseded copy when the new one fits in its slot, append otherwise
+        slot = self.index.get(key)
+        if slot is not None and len(payload) <= slot[1]:
+            offset = slot[0]
+        else:
+            offset = self.end
+            self.end += len(payload)
+        self.live += len(payload) - (slot[1] if slot else 0)
+        self.file.seek(offset)
+        self.file.write(payload)
+        self.index[key] = (offset, len(payload), encoding)
+        if self.end - self.live > self.live:
+            self.compact()
+
+    def compact(self):
+        # Copy the live chunks to a fresh file once dead bytes outweigh them
+        old, self.file = self.file, tempfile.TemporaryFile(prefix="voxel_chunks_")
+        self.end = 0
+        for key, (offset, length, encoding) in sorted(self.index.items(), key=lambda item: item[1][0]):
+            old.seek(offset)
+            self.file.write(old.read(length))
+            self.index[key] = (self.end, length, encoding)
+            self.end += length
+        self.live = self.end
+        old.close()
+
+
+class VoxelStore:
+    """Chunked uint8 grid of voxel values (0 = empty) for one scene"""
+
+    def __init__(self, budget=0):
+        self.chunks = ChunkCache(budget)
+        self.count = 0
+        # Bumped on every edit so derived data (LODs, previews) can refresh per chunk
+        self.versions = {}
+        self.pyramids = {}
+        # Cell -> names of the voxel objects drawing it, and the scene's object count when last in sync
+        self.instances = {}
+        self.scene_objects = 0
+        # RGBA colours of values 1..256 as stored in an imported .vox file, saved on the scene
+        self.palette = None
+
+    def get_chunk(self, key, create=False):
+        chunk = self.chunks.get(key)
+        if chunk is None and create:
+            chunk = np.zeros((CHUNK_SIZE,) * 3, dtype=np.uint8)
+            self.chunks[key] = chunk
+        return chunk
+
+    def chunk_changed(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+        self.chunks.dirty.add(key)
+        chunk = self.chunks.get(key)
+        if chunk is not None and not chunk.any():
+            del self.chunks[key]
+
+    def chunk_keys(self, lo, hi):
+        c_lo = np.floor_divide(lo, CHUNK_SIZE)
+        c_hi = np.floor_divide(np.subtract(hi, 1), CHUNK_SIZE)
+        for cx in range(c_lo[0], c_hi[0] + 1):
+            for cy in range(c_lo[1], c_hi[1] + 1):
+                for cz in range(c_lo[2], c_hi[2] + 1):
+                    yield (cx, cy, cz)
+
+    def grid_blocks(self, dims):
+        # Chunk-aligned [origin, hi) blocks covering the master grid
+        for key in self.chunk_keys((0, 0, 0), dims):
+            origin = np.multiply(key, CHUNK_SIZE)
+            yield origin, np.minimum(origin + CHUNK_SIZE, dims)
+
+    def overlap(self, key, lo, hi):
+        # Slices of the chunk and of the [lo, hi) region covering their overlap
+        origin = np.multiply(key, CHUNK_SIZE)
+        a = np.maximum(lo, origin)
+        b = np.minimum(hi, origin + CHUNK_SIZE)
+        in_chunk = tuple(slice(s, e) for s, e in zip(a - origin, b - origin))
+        in_region = tuple(slice(s, e) for s, e in zip(a - lo, b - lo))
+        return in_chunk, in_region
+
+    def read_region(self, lo, hi):
+        lo, hi = np.asarray(lo), np.asarray(hi)
+        out = np.zeros(hi - lo, dtype=np.uint8)
+        for key in self.chunk_keys(lo, hi):
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                in_chunk, in_region = self.overlap(key, lo, hi)
+                out[in_region] = chunk[in_chunk]
+        return out
+
+    def write_region(self, lo, values, mask=None):
+        """Write a dense block at lo, optionally only where mask is set, and return the delta"""
+        lo = np.asarray(lo)
+        hi = lo + values.shape
+        changed, olds, news = [], [], []
+        for key in self.chunk_keys(lo, hi):
+            in_chunk, in_region = self.overlap(key, lo, hi)
+            new = values[in_region]
+            if mask is not None:
+                m = mask[in_region]
+                if not m.any():
+                    continue
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                if not (new if mask is None else new[m]).any():
+                    continue
+                chunk = self.get_chunk(key, create=True)
+
+            old = chunk[in_chunk]
+            if mask is not None:
+                new = np.where(m, new, old)
+            diff = np.nonzero(old != new)
+            if not diff[0].size:
+                continue
+
+            olds.append(old[diff])
+            news.append(new[diff])
+            changed.append(np.stack(diff, axis=1) + [s.start for s in in_chunk] + np.multiply(key, CHUNK_SIZE))
+            chunk[in_chunk] = new
+            self.chunk_changed(key)
+
+        return self.finish_delta(changed, olds, news)
+
+    def fill_box(self, lo, hi, value):
+        """Assign value to every cell in [lo, hi) and return the delta"""
+        shape = np.subtract(hi, lo)
+        if np.any(shape <= 0):
+            return empty_delta()
+        return self.write_region(lo, np.broadcast_to(np.uint8(value), tuple(shape)))
+
+    def apply_boolean(self, lo, other, operation):
+        """Combine the occupancy at lo with a boolean block chunk by chunk and return the delta"""
+        lo = np.asarray(lo)
+        hi = lo + other.shape
+        op = BOOLEAN_OPS[operation]
+        deltas = []
+        for key in self.chunk_keys(lo, hi):
+            in_chunk, in_region = self.overlap(key, lo, hi)
+            b = other[in_region]
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                if not b.any():
+                    continue
+                a = np.zeros(b.shape, dtype=np.uint8)
+            else:
+                a = chunk[in_chunk]
+
+            # Surviving cells keep their value, newly added ones get 1
+            keep = op(a != 0, b)
+            new = np.where(keep, np.maximum(a, 1), 0).astype(np.uint8)
+            deltas.append(self.write_region(lo + [s.start for s in in_region], new))
+        return merge_deltas(deltas)
+
+    def clear_outside(self, lo, hi):
+        """Clear every cell outside the box [lo, hi) and return the delta"""
+        deltas = []
+        for key in list(self.chunks):
+            origin = np.multiply(key, CHUNK_SIZE)
+            if np.all(origin >= lo) and np.all(origin + CHUNK_SIZE <= hi):
+                continue
+            outside = np.ones((CHUNK_SIZE,) * 3, dtype=bool)
+            if np.all(np.maximum(lo, origin) < np.minimum(hi, origin + CHUNK_SIZE)):
+                outside[self.overlap(key, lo, hi)[0]] = False
+            deltas.append(self.write_region(origin, np.zeros(outside.shape, dtype=np.uint8), outside))
+        return merge_deltas(deltas)
+
+    def map_occupancy(self, dims, halo, fn, skip_empty=True):
+        """Replace the occupancy of every chunk in the grid with fn(occupancy, inside grid) padded by halo"""
+        # Blocks go by x slab; a result is written once no later block reads its cells
+        reach = -(-halo // CHUNK_SIZE)
+        pending, deltas = deque(), []
+        for origin, hi in self.grid_blocks(dims):
+            while pending and pending[0][0][0] < origin[0] - reach * CHUNK_SIZE:
+                deltas.append(self.write_region(*pending.popleft()))
+            block = self.read_region(origin - halo, hi + halo)
+            if skip_empty and not block.any():
+                continue
+
+            # Cells outside the master grid always count as empty
+            inside = np.ones(block.shape, dtype=bool)
+            for axis, (start, size) in enumerate(zip(origin - halo, dims)):
+                cells = np.arange(start, start + block.shape[axis])
+                shape = [1, 1, 1]
+                shape[axis] = -1
+                inside &= ((cells >= 0) & (cells < size)).reshape(shape)
+
+            core = tuple(slice(halo, halo + n) for n in hi - origin)
+            occupied = fn(block != 0, inside)[core]
+            pending.append((origin, np.where(occupied, np.maximum(block[core], 1), 0).astype(np.uint8)))
+
+        deltas.extend(self.write_region(origin, values) for origin, values in pending)
+        return merge_deltas(deltas)
+
+    def set_cells(self, coords, value):
+        """Set individual cells to value and return the delta"""
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 3)
+        values = np.broadcast_to(np.asarray(value, dtype=np.uint8), len(coords))
+        if not len(coords):
+            return empty_delta()
+        first = np.unique(pack_coords(coords - coords.min(axis=0)), return_index=True)[1]
+        coords, values = coords[first], values[first]
+        keys, local = np.divmod(coords, CHUNK_SIZE)
+        changed, olds, news = [], [], []
+        for key, rows in group_rows(keys):
+            new = values[rows]
+            chunk = self.get_chunk(key, create=bool(new.any()))
+            idx = tuple(local[rows].T)
+            old = chunk[idx] if chunk is not None else np.zeros_like(new)
+            diff = old != new
+            if not diff.any():
+                continue
+
+            olds.append(old[diff])
+            news.append(new[diff])
+            changed.append(coords[rows][diff])
+            chunk[idx] = new
+            self.chunk_changed(key)
+
+        return self.finish_delta(changed, olds, news)
+
+    def finish_delta(self, changed, olds, news):
+        if not changed:
+            return empty_delta()
+        delta = (np.concatenate(changed), np.concatenate(olds), np.concatenate(news))
+        self.count += int(np.count_nonzero(delta[2])) - int(np.count_nonzero(delta[1]))
+        return delta
+
+    def replace_chunks(self, chunks):
+        """Swap the whole volume for (key, chunk) pairs, taken one at a time, and return the delta"""
+        deltas, written = [], set()
+        try:
+            for key, chunk in chunks:
+                written.add(key)
+                deltas.append(self.write_region(np.multiply(key, CHUNK_SIZE), chunk))
+        except Exception:
+            # A source failing halfway leaves the volume as it was
+            coords, old, _ = merge_deltas(deltas)
+            self.set_cells(coords, old)
+            raise
+        for key in set(self.chunks) - written:
+            deltas.append(self.write_region(np.multiply(key, CHUNK_SIZE), np.zeros((CHUNK_SIZE,) * 3, dtype=np.uint8)))
+        return merge_deltas(deltas)
+
+    def lod(self, level, reduce='ANY'):
+        """Occupancy per chunk downsampled by 2**level, refreshing only chunks edited since the last call"""
+        if level == 0:
+            return self.chunks
+        pyramid = self.pyramids.get(reduce)
+        if pyramid is None:
+            pyramid = self.pyramids[reduce] = LodPyramid(reduce)
+        pyramid.refresh(self)
+        return pyramid.levels[level - 1]
+
+    def cells(self):
+        """Return coordinates and values of every filled cell"""
+        coords, values = [], []
+        for key, chunk in self.chunks.items():
+            local = np.argwhere(chunk)
+            coords.append(local + np.multiply(key, CHUNK_SIZE))
+            values.append(chunk[tuple(local.T)])
+        if not coords:
+            return np.zeros((0, 3), dtype=np.int64), np.zeros(0, dtype=np.uint8)
+        return np.concatenate(coords), np.concatenate(values)
+
+
+BOOLEAN_OPS = {
+    'UNION': np.logical_or,
+    'INTERSECT': np.logical_and,
+    'DIFFERENCE': lambda a, b: a & ~b,
+    'XOR': np.logical_xor,
+}
+
+
+def merge_deltas(deltas):
+    deltas = [delta for delta in deltas if len(delta[0])]
+    if not deltas:
+        return empty_delta()
+    return tuple(np.concatenate(parts) for parts in zip(*deltas))
+
+
+LOD_LEVELS = 3
+
+
+class LodPyramid:
+    """2x, 4x and 8x downsampled occupancy of a store, kept per chunk"""
+
+    def __init__(self, reduce):
+        self.reduce = reduce
+        self.levels = [{} for _ in range(LOD_LEVELS)]
+        self.built = {}
+
+    def refresh(self, store):
+        for key, version in store.versions.items():
+            if self.built.get(key) == version:
+                continue
+            self.built[key] = version
+
+            chunk = store.chunks.get(key)
+            block = chunk != 0 if chunk is not None else None
+            for level in self.levels:
+                if block is not None:
+                    block = reduce_block(block, self.reduce)
+                if block is not None and block.any():
+                    level[key] = block
+                else:
+                    level.pop(key, None)
+                    block = None
+
+
+def reduce_block(block, reduce):
+    n = [size // 2 for size in block.shape]
+    cubes = block.reshape(n[0], 2, n[1], 2, n[2], 2)
+    if reduce == 'ANY':
+        return cubes.any(axis=(1, 3, 5))
+    return cubes.sum(axis=(1, 3, 5)) >= 4
+
+
+def empty_delta():
+    return np.zeros((0, 3), dtype=np.int64), np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.uint8)
+
+
+def group_rows(keys):
+    # Yield (chunk key, row indices) for an (N, 3) array of chunk keys
+    if not len(keys):
+        return
+    packed = pack_coords(keys - keys.min(axis=0))
+    _, first, inverse = np.unique(packed, return_index=True, return_inverse=True)
+    unique, inverse = keys[first], inverse.ravel()
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.cumsum(np.bincount(inverse, minlength=len(unique)))
+    start = 0
+    for key, end in zip(map(tuple, unique.tolist()), bounds.tolist()):
+        yield key, order[start:end]
+        start = end
+
+
+def cell_chunks(coords, values):
+    """Yield (key, chunk) pairs holding the given cells, building one chunk at a time"""
+    keys, local = np.divmod(np.asarray(coords, dtype=np.int64), CHUNK_SIZE)
+    values = np.broadcast_to(np.asarray(values, dtype=np.uint8), len(keys))
+    for key, rows in group_rows(keys):
+        chunk = np.zeros((CHUNK_SIZE,) * 3, dtype=np.uint8)
+        chunk[tuple(local[rows].T)] = values[rows]
+        yield key, chunk
+
+
+# --------------------------- UNDO JOURNAL ---------------------------------
+
+class VoxelJournal:
+    """Undo/redo stacks of packed per-stroke voxel deltas
+
+    Entries are (keys, old, new, dims or None, origin); keys are packed relative to origin so
+    cells below zero survive.
+    """
+
+    def __init__(self):
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.pending = []
+        self.pending_dims = None
+        self.size = 0
+
+    def record(self, delta):
+        if len(delta[0]):
+            self.pending.append(delta)
+
+    def record_dims(self, old, new):
+        # A stroke that resizes the grid keeps the first old and last new size
+        first = self.pending_dims[0] if self.pending_dims else tuple(old)
+        self.pending_dims = (first, tuple(new))
+
+    def end_stroke(self, limit):
+        """Close the pending stroke; False if it alone is over limit and was dropped"""
+        if not self.pending and not self.pending_dims:
+            return True
+        coords, old, new = (np.concatenate(parts) for parts in zip(*(self.pending or [empty_delta()])))
+        dims = self.pending_dims if self.pending_dims and self.pending_dims[0] != self.pending_dims[1] else None
+        self.pending = []
+        self.pending_dims = None
+
+        # A cell touched twice in one stroke keeps its first old and last new value
+        origin = coords.min(axis=0) if len(coords) else np.zeros(3, dtype=np.int64)
+        keys = pack_coords(coords - origin)
+        unique, first = np.unique(keys, return_index=True)
+        last = len(keys) - 1 - np.unique(keys[::-1], return_index=True)[1]
+        old, new = old[first], new[last]
+        keep = old != new
+        entry = (unique[keep], old[keep], new[keep], dims and np.array(dims, dtype=np.int64), origin)
+        if not len(entry[0]) and dims is None:
+            return True
+
+        for dropped in self.redo_stack:
+            self.size -= entry_size(dropped)
+        self.redo_stack = []
+
+        # A stroke that can't fit on its own would otherwise push out the whole history
+        if entry_size(entry) > limit:
+            return False
+        self.undo_stack.append(entry)
+        self.size += entry_size(entry)
+        while self.undo_stack and self.size > limit:
+            self.size -= entry_size(self.undo_stack.popleft())
+        return True
+
+    def undo(self, store):
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        return store.set_cells(unpack_coords(entry[0]) + entry[4], entry[1]), None if entry[3] is None else entry[3][0]
+
+    def redo(self, store):
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        return store.set_cells(unpack_coords(entry[0]) + entry[4], entry[2]), None if entry[3] is None else entry[3][1]
+
+
+def entry_size(entry):
+    return sum(part.nbytes for part in entry if part is not None)
+
+
+# ------------------------- SCENE SYNC -------------------------------------
+
+# Keyed by scene pointer, which stays the same when a scene is renamed
+_stores = {}
+_journals = {}
+
+
+def scene_key(scene):
+    return scene.as_pointer()
+
+
+def get_voxel_base():
+    base = bpy.data.objects.get("VoxelBase")
+    if base is None:
+        bpy.ops.mesh.primitive_cube_add(size=1, location=(0, 0, 0))
+        base = bpy.context.active_object
+        base.name = "VoxelBase"
+        base.hide_set(True)
+        base.hide_render = True
+        base.display_type = 'WIRE'
+        base.select_set(False)
+    return base
+
+
+def voxel_collection(context):
+    for obj in context.selected_objects:
+        if obj.users_collection:
+            return obj.users_collection[0]
+    return context.collection
+
+
+def scan_scene_voxels(scene):
+    store = VoxelStore()
+    base = bpy.data.objects.get("VoxelBase")
+    if base is None:
+        return store
+
+    # Cells come from where the objects are, older files named them by grid index
+    voxels = [obj for obj in scene.objects if obj.data == base.data and obj != base]
+    if voxels:
+        cells = np.floor(np.array([obj.matrix_world.translation[:] for obj in voxels])).astype(np.int64)
+        store.set_cells(cells, [obj.get("voxel_value", 1) for obj in voxels])
+        for cell, obj in zip(map(tuple, cells.tolist()), voxels):
+            store.instances.setdefault(cell, []).append(obj.name)
+    store.scene_objects = len(scene.objects)
+    store.palette = scene_palette(scene)
+    return store
+
+
+def scene_palette(scene):
+    palette = scene.get("voxel_palette")
+    return np.frombuffer(bytes(palette), dtype=np.uint8).reshape(256, 4).copy() if palette else None
+
+
+def set_scene_palette(context, palette):
+    scene = context.scene
+    get_store(context).palette = palette
+    if palette is None:
+        scene.pop("voxel_palette", None)
+    else:
+        scene["voxel_palette"] = palette.tobytes()
+
+
+def mark_scene_synced(context):
+    # Objects the addon adds or removes itself don't make the store stale
+    store = _stores.get(scene_key(context.scene))
+    if store is not None:
+        store.scene_objects = len(context.scene.objects)
+
+
+def store_budget(scene):
+    return scene.voxel_grid_props.memory_budget * 1024 * 1024 // CHUNK_SIZE ** 3
+
+
+def get_store(context):
+    scene = context.scene
+    store = _stores.get(scene_key(scene))
+    if scene.voxel_grid_props.compact_storage:
+        if store is None:
+            store = _stores[scene_key(scene)] = restore_store(scene)
+    elif store is None or store.scene_objects != len(scene.objects):
+        # Any object added or deleted by hand in this scene may have been a voxel
+        store = scan_scene_voxels(scene)
+        _stores[scene_key(scene)] = store
+    store.chunks.budget = store_budget(scene)
+    return store
+
+
+def restore_store(scene):
+    """Rebuild a store from the compressed block saved on the scene"""
+    # Chunks past the budget page straight out instead of all landing in RAM first
+    store = VoxelStore(store_budget(scene))
+    blob = scene.get("voxel_data")
+    if blob:
+        for key, chunk in BvoxReader(io.BytesIO(bytes(blob))).chunks():
+            store.count += int(np.count_nonzero(chunk))
+            store.chunks[key] = chunk
+        # Restored versions keep the saved display meshes up to date
+        versions = np.array(scene.get("voxel_versions", []), dtype=np.int64).reshape(-1, 4)
+        store.versions = {tuple(row[:3]): int(row[3]) for row in versions.tolist()}
+    store.palette = scene_palette(scene)
+    return store
+
+
+def save_store(scene, store):
+    props = scene.voxel_grid_props
+    stream = io.BytesIO()
+    write_bvox(stream, store.chunks, (props.dim_x, props.dim_y, props.dim_z))
+    scene["voxel_data"] = stream.getvalue()
+    scene["voxel_versions"] = [n for key, version in store.versions.items() for n in (*key, version)]
+
+
+def drop_saved_store(scene):
+    for name in ("voxel_data", "voxel_versions"):
+        scene.pop(name, None)
+
+
+def find_scene_collection(scene, role):
+    # Collections are tagged rather than looked up by name, so every scene keeps its own
+    for collection in scene.collection.children:
+        if collection.get("voxel_role") == role:
+            return collection
+    return None
+
+
+def scene_collection(scene, role, name):
+    collection = find_scene_collection(scene, role)
+    if collection is None:
+        collection = bpy.data.collections.new(name)
+        collection["voxel_role"] = role
+        scene.collection.children.link(collection)
+    return collection
+
+
+def remove_scene_collection(scene, role):
+    collection = find_scene_collection(scene, role)
+    if collection:
+        objects = list(collection.objects)
+        bpy.data.batch_remove(objects + [obj.data for obj in objects] + [collection])
+
+
+def display_collection(context):
+    return scene_collection(context.scene, 'DISPLAY', "VoxelDisplay")
+
+
+def set_compact_storage(context):
+    """Move the scene's voxels between instance objects and the compact store"""
+    scene = context.scene
+    if scene.voxel_grid_props.compact_storage:
+        store = _stores.get(scene_key(scene))
+        if store is None or store.scene_objects != len(scene.objects):
+            store = _stores[scene_key(scene)] = scan_scene_voxels(scene)
+        base = bpy.data.objects.get("VoxelBase")
+        if base:
+            bpy.data.batch_remove([obj for obj in scene.objects if obj.data == base.data and obj != base])
+        store.instances = {}
+        sync_chunk_meshes(display_collection(context), store, lambda key: 0)
+        return
+
+    store = _stores.get(scene_key(scene)) or restore_store(scene)
+    _stores[scene_key(scene)] = store
+    remove_scene_collection(scene, 'DISPLAY')
+    drop_saved_store(scene)
+    coords, values = store.cells()
+    commit_delta(context, (coords, np.zeros_like(values), values), record=False)
+
+
+def get_journal(context):
+    return _journals.setdefault(scene_key(context.scene), VoxelJournal())
+
+
+def end_stroke(context):
+    limit = context.scene.voxel_grid_props.undo_memory * 1024 * 1024
+    if not get_journal(context).end_stroke(limit):
+        context.window_manager.popup_menu(
+            lambda menu, context: menu.layout.label(text="Raise Undo Memory (MB) to make edits this large undoable."),
+            title="Edit too large for voxel undo", icon='ERROR')
+
+
+# Every filled cell becomes a Blender object outside compact storage, which
+# takes seconds per hundred thousand; bigger edits need Compact Storage
+MAX_INSTANCE_FILL = 200000
+
+
+def too_many_instances(context, count):
+    """Report and return True when count new voxel objects is more than Blender can create quickly"""
+    if count <= MAX_INSTANCE_FILL or context.scene.voxel_grid_props.compact_storage:
+        return False
+    context.window_manager.popup_menu(
+        lambda menu, context: menu.layout.label(text="Turn on Compact Storage to make edits this large."),
+        title=f"{count} new voxels is too many voxel objects", icon='ERROR')
+    return True
+
+
+def commit_delta(context, delta, record=True):
+    """Mirror a store delta onto the voxel objects in one batch; False if it was refused and undone"""
+    coords, old, new = delta
+    if not len(coords):
+        return True
+    # Undo steps only bring back objects that existed before, so only new edits are checked
+    if record and too_many_instances(context, int(np.count_nonzero((old == 0) & (new != 0)))):
+        get_store(context).set_cells(coords, old)
+        return False
+    if record:
+        get_journal(context).record(delta)
+    if context.scene.voxel_grid_props.compact_storage:
+        # Only the edited chunks and the neighbours sharing their border faces can change
+        touched = set(map(tuple, np.unique(np.floor_divide(coords, CHUNK_SIZE), axis=0).tolist()))
+        keys = touched.union(*map(chunk_neighbours, touched))
+        sync_chunk_meshes(display_collection(context), get_store(context), lambda key: 0, keys=keys)
+        return True
+
+    store = _stores[scene_key(context.scene)]
+    objects = bpy.data.objects
+    removed = coords[new == 0].tolist()
+    if removed:
+        names = [name for cell in removed for name in store.instances.pop(tuple(cell), ())]
+        bpy.data.batch_remove([obj for obj in map(objects.get, names) if obj])
+
+    # Values other than 1 (.vox colour indices) live on the objects so rescans keep them
+    added = (old == 0) & (new != 0)
+    if added.any():
+        mesh = get_voxel_base().data
+        collection = voxel_collection(context)
+        for (x, y, z), value in zip(coords[added].tolist(), new[added].tolist()):
+            if (x, y, z) in store.instances:
+                continue
+            inst = objects.new(f"voxel_{x}_{y}_{z}", mesh)
+            inst.location = (x + 0.5, y + 0.5, z + 0.5)
+            if value != 1:
+                inst["voxel_value"] = value
+            collection.objects.link(inst)
+            store.instances[x, y, z] = [inst.name]
+
+    changed = (old != 0) & (new != 0)
+    for cell, value in zip(coords[changed].tolist(), new[changed].tolist()):
+        for obj in map(objects.get, store.instances.get(tuple(cell), ())):
+            if obj:
+                obj["voxel_value"] = value
+    mark_scene_synced(context)
+    return True
+
+
+def set_grid_dims(context, dims):
+    """Resize the master grid as part of the current undo stroke"""
+    props = context.scene.voxel_grid_props
+    dims = tuple(max(1, int(n)) for n in dims)
+    get_journal(context).record_dims((props.dim_x, props.dim_y, props.dim_z), dims)
+    props.dim_x, props.dim_y, props.dim_z = dims
+
+
+def load_volume(context, chunks, dims):
+    """Replace the scene's voxel volume with (key, chunk) pairs and resize the grid to dims, None if refused"""
+    # Chunks go straight into the scene's store, so its memory budget applies while loading
+    delta = get_store(context).replace_chunks(chunks)
+    if not commit_delta(context, delta):
+        return None
+    set_grid_dims(context, dims)
+    end_stroke(context)
+    # The .vox palette and offset belonged to the replaced volume
+    set_scene_palette(context, None)
+    context.scene.pop("voxel_vox_offset", None)
+    return get_store(context)
+
+
+@persistent
+def clear_stores(dummy):
+    _stores.clear()
+    _journals.clear()
+
+
+@persistent
+def save_stores(dummy):
+    # Stores never touched since loading still have their saved block
+    for scene in bpy.data.scenes:
+        store = _stores.get(scene_key(scene))
+        if store is not None and scene.voxel_grid_props.compact_storage:
+            save_store(scene, store)
+
+
+def step_journal(context, redo=False):
+    journal = get_journal(context)
+    store = get_store(context)
+    step = journal.redo(store) if redo else journal.undo(store)
+    if step is None:
+        return False
+    delta, dims = step
+    if dims is not None:
+        props = context.scene.voxel_grid_props
+        props.dim_x, props.dim_y, props.dim_z = dims.tolist()
+    commit_delta(context, delta, record=False)
+    return True
+
+
+def handle_journal_keys(context, event):
+    # Ctrl+Z / Ctrl+Shift+Z while a modal voxel tool is running
+    if event.type == 'Z' and event.value == 'PRESS' and event.ctrl:
+        # Close the stroke being dragged so it is the one undone
+        end_stroke(context)
+        step_journal(context, redo=event.shift)
+        return True
+    return False
+
+
+def layer_cell_under_mouse(context, event, offset=0.0):
+    region = context.region
+    rv3d = context.region_data
+    coord = event.mouse_region_x, event.mouse_region_y
+
+    view_vector = view3d_utils.region_2d_to_vector_3d(region, rv3d, coord)
+    ray_origin = view3d_utils.region_2d_to_origin_3d(region, rv3d, coord)
+
+    props = context.scene.voxel_grid_props
+    orientation = props.orientation
+    layer = props.current_layer
+
+    # Determine plane normal and point based on orientation
+    if orientation == 'XY':
+        normal = Vector((0, 0, 1))
+        point = Vector((0, 0, layer + offset))
+    elif orientation == 'XZ':
+        normal = Vector((0, 1, 0))
+        point = Vector((0, layer + offset, 0))
+    else:  # 'YZ'
+        normal = Vector((1, 0, 0))
+        point = Vector((layer + offset, 0, 0))
+
+    dot = view_vector.dot(normal)
+    if abs(dot) < 1e-5:
+        return None
+
+    t = (point - ray_origin).dot(normal) / dot
+    hit = ray_origin + t * view_vector
+
+    if orientation == 'XY':
+        return int(hit.x), int(hit.y), layer
+    elif orientation == 'XZ':
+        return int(hit.x), layer, int(hit.z)
+    return layer, int(hit.y), int(hit.z)
+
+
+def in_grid(props, x, y, z):
+    return 0 <= x < props.dim_x and 0 <= y < props.dim_y and 0 <= z < props.dim_z
+
+
+# ---------------------------- FLOOD FILL ----------------------------------
+
+def flood_region(grid, seed):
+    """Mask of the cells 6-connected to seed that share its value"""
+    # A -1 border keeps every neighbour index inside the padded array
+    padded = np.pad(grid.astype(np.int16), 1, constant_values=-1)
+    seed = tuple(np.add(seed, 1))
+    target = (padded == padded[seed]).ravel()
+
+    strides = np.array([padded.shape[1] * padded.shape[2], padded.shape[2], 1])
+    steps = np.concatenate((strides, -strides))
+
+    visited = np.zeros(target.size, dtype=bool)
+    frontier = np.array([np.ravel_multi_index(seed, padded.shape)])
+    visited[frontier] = True
+    while frontier.size:
+        neighbours = (frontier[:, None] + steps).ravel()
+        neighbours = np.unique(neighbours[target[neighbours] & ~visited[neighbours]])
+        visited[neighbours] = True
+        frontier = neighbours
+
+    return visited.reshape(padded.shape)[1:-1, 1:-1, 1:-1]
+
+
+# ---------------------------- VOXELIZE ------------------------------------
+
+def evaluated_mesh(context, obj):
+    """Local vertices, loop triangles and world matrix of an object's evaluated mesh"""
+    eval_obj = obj.evaluated_get(context.evaluated_depsgraph_get())
+    mesh = eval_obj.to_mesh()
+    mesh.calc_loop_triangles()
+    verts = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", verts)
+    tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tris)
+    matrix = np.array(eval_obj.matrix_world, dtype=np.float64)
+    eval_obj.to_mesh_clear()
+    return verts.reshape(-1, 3), tris.reshape(-1, 3), matrix
+
+
+def surface_occupancy(verts, tris, dims, threshold):
+    """Box [lo, hi) and occupancy of the cells whose centers lie within threshold of a world space mesh"""
+    from mathutils.bvhtree import BVHTree
+
+    # Cells further than threshold from the bounding box can never pass
+    lo = np.clip(np.floor(verts.min(axis=0) - threshold).astype(int), 0, dims)
+    hi = np.clip(np.ceil(verts.max(axis=0) + threshold).astype(int), 0, dims)
+    block = np.zeros(np.maximum(hi - lo, 0), dtype=bool)
+    bvh = BVHTree.FromPolygons(verts.tolist(), tris.tolist())
+    for x in range(lo[0], hi[0]):
+        for y in range(lo[1], hi[1]):
+            for z in range(lo[2], hi[2]):
+                if bvh.find_nearest(Vector((x + 0.5, y + 0.5, z + 0.5)), threshold)[3] is not None:
+                    block[x - lo[0], y - lo[1], z - lo[2]] = True
+    return lo, block
+
+
+class VoxelizeCache:
+    """Voxelization results on disk keyed by a hash of their inputs, least recently used dropped past limit bytes"""
+
+    VERSION = b"voxelize-1"
+
+    def __init__(self, directory, limit):
+        self.directory = directory
+        self.limit = limit
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def key(cls, verts, tris, matrix, dims, threshold):
+        digest = hashlib.blake2b(cls.VERSION, digest_size=16)
+        for array in (verts, tris, matrix, np.asarray(dims, dtype=np.int64)):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(struct.pack("<d", threshold))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    # A broken or unwritable cache only costs a re-voxelization, so its errors are never raised
+    def get(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                lo, shape = data["lo"], tuple(data["shape"])
+                block = np.unpackbits(data["bits"], count=int(np.prod(shape))).reshape(shape).astype(bool)
+            # Touching the file marks it as recently used
+            os.utime(path)
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            self.discard(path)
+            return None
+        return lo, block
+
+    def put(self, key, lo, block):
+        # Write under a temporary name so a half-written file is never read back
+        temp = self.path(key) + ".tmp.npz"
+        try:
+            np.savez_compressed(temp, lo=lo, shape=np.array(block.shape), bits=np.packbits(block))
+            os.replace(temp, self.path(key))
+        except OSError:
+            self.discard(temp)
+            return
+        self.evict()
+
+    def evict(self):
+        entries = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".npz"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.limit:
+                break
+            self.discard(path)
+            total -= size
+
+    @staticmethod
+    def discard(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def voxelize_cache(props):
+    if not props.cache_size:
+        return None
+    directory = bpy.path.abspath(props.cache_dir) if props.cache_dir else os.path.join(tempfile.gettempdir(), "voxel_cache")
+    try:
+        return VoxelizeCache(directory, props.cache_size * 1024 * 1024)
+    except OSError:
+        # Voxelize without a cache when the folder can't be created
+        return None
+
+
+def union_blocks(pieces):
+    """One (lo, block) over the bounding box of several (lo, boolean block) pieces"""
+    pieces = [(np.asarray(lo), block) for lo, block in pieces if block.size]
+    if not pieces:
+        return np.zeros(3, dtype=int), np.zeros((0, 0, 0), dtype=bool)
+    lo = np.min([lo for lo, _ in pieces], axis=0)
+    hi = np.max([lo + block.shape for lo, block in pieces], axis=0)
+    out = np.zeros(hi - lo, dtype=bool)
+    for start, block in pieces:
+        out[tuple(slice(a, a + n) for a, n in zip(start - lo, block.shape))] |= block
+    return lo, out
+
+
+def mesh_occupancy(context, objects, dims, threshold):
+    """Box corner and occupancy of the cells whose centers lie within threshold of the objects' surfaces"""
+    pieces = []
+    cache = voxelize_cache(context.scene.voxel_grid_props)
+    for obj in objects:
+        verts, tris, matrix = evaluated_mesh(context, obj)
+        if not len(tris):
+            continue
+
+        result = None
+        if cache:
+            key = VoxelizeCache.key(verts, tris, matrix, dims, threshold)
+            result = cache.get(key)
+        if result is None:
+            world = verts.astype(np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+            result = surface_occupancy(world, tris, dims, threshold)
+            if cache:
+                cache.put(key, *result)
+
+        pieces.append(result)
+
+    return union_blocks(pieces)
+
+
+# ---------------------------- MORPHOLOGY ----------------------------------
+
+def grow(mask, steps, box=False, inside=None):
+    # Cells near the block edge come out wrong, callers pad by at least steps
+    for _ in range(steps):
+        out = mask.copy()
+        for axis in range(3):
+            # Growing axis after axis from the running result sweeps out a 3x3x3 box
+            src = out.copy() if box else mask
+            lead = [slice(None)] * 3
+            trail = [slice(None)] * 3
+            lead[axis], trail[axis] = slice(1, None), slice(None, -1)
+            out[tuple(lead)] |= src[tuple(trail)]
+            out[tuple(trail)] |= src[tuple(lead)]
+        mask = out if inside is None else out & inside
+    return mask
+
+
+def shrink(mask, steps, box=False):
+    # Growing the complement lets empty space outside the grid eat the border
+    return ~grow(~mask, steps, box)
+
+
+MORPHOLOGY = {
+    'DILATE': (1, lambda m, inside, n, box: grow(m, n, box, inside)),
+    'ERODE': (1, lambda m, inside, n, box: shrink(m, n, box)),
+    'OPEN': (2, lambda m, inside, n, box: grow(shrink(m, n, box), n, box, inside)),
+    'CLOSE': (2, lambda m, inside, n, box: shrink(grow(m, n, box, inside), n, box)),
+    'HOLLOW': (1, lambda m, inside, n, box: m & ~shrink(m, n, box)),
+}
+
+
+# ------------------------------ MESHER ------------------------------------
+
+# Outward facing quad corners for each of the 6 cube faces
+CUBE_FACES = [
+    ((1, 0, 0), ((1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1))),
+    ((-1, 0, 0), ((0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0))),
+    ((0, 1, 0), ((0, 1, 0), (0, 1, 1), (1, 1, 1), (1, 1, 0))),
+    ((0, -1, 0), ((0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1))),
+    ((0, 0, 1), ((0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1))),
+    ((0, 0, -1), ((0, 0, 0), (0, 1, 0), (1, 1, 0), (1, 0, 0))),
+]
+
+
+def contains(sorted_keys, keys):
+    idx = np.minimum(np.searchsorted(sorted_keys, keys), max(len(sorted_keys) - 1, 0))
+    return sorted_keys[idx] == keys if len(sorted_keys) else np.zeros(len(keys), dtype=bool)
+
+
+def surface_quads(coords, solid=None):
+    """Vertices and quads of the faces of a cell set that no solid cell covers
+
+    solid defaults to coords itself; pass the whole volume to mesh one piece of it.
+    """
+    coords = np.asarray(coords, dtype=np.int64)
+    # Shift by one so every neighbour has non-negative packed coordinates
+    shifted = coords + 1
+    keys = np.sort(pack_coords((coords if solid is None else np.asarray(solid, dtype=np.int64)) + 1))
+
+    corners = []
+    for direction, quad in CUBE_FACES:
+        exposed = ~contains(keys, pack_coords(shifted + direction))
+        corners.append(coords[exposed][:, None, :] + np.array(quad))
+    corners = np.concatenate(corners).reshape(-1, 3)
+    if not len(corners):
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 4), dtype=np.int32)
+
+    # Weld shared corners, interior faces were never emitted
+    unique, inverse = np.unique(pack_coords(corners + 1), return_inverse=True)
+    verts = (unpack_coords(unique) - 1).astype(np.float32)
+    return verts, inverse.reshape(-1, 4).astype(np.int32)
+
+
+def mesh_from_quads(name, verts, quads):
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.ravel())
+    mesh.loops.add(quads.size)
+    mesh.loops.foreach_set("vertex_index", quads.ravel())
+    mesh.polygons.add(len(quads))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, quads.size, 4, dtype=np.int32))
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set("loop_total", np.full(len(quads), 4, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+# --------------------------- COMPONENTS -----------------------------------
+
+# Half of each neighbourhood, the other half is covered from the far side
+FORWARD_OFFSETS = {
+    '6': [o for o in np.ndindex(3, 3, 3) if sum(abs(c - 1) for c in o) == 1],
+    '18': [o for o in np.ndindex(3, 3, 3) if 1 <= sum(abs(c - 1) for c in o) <= 2],
+    '26': [o for o in np.ndindex(3, 3, 3) if o != (1, 1, 1)],
+}
+FORWARD_OFFSETS = {
+    name: np.array([o for o in offsets if o > (1, 1, 1)]) - 1
+    for name, offsets in FORWARD_OFFSETS.items()
+}
+
+
+def label_components(coords, connectivity='6'):
+    """Label connected cells with a vectorized union-find, returning labels and sizes"""
+    n = len(coords)
+    shifted = np.asarray(coords, dtype=np.int64) + 1
+    keys = pack_coords(shifted)
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+
+    src, dst = [], []
+    for offset in FORWARD_OFFSETS[connectivity]:
+        nb = pack_coords(shifted + offset)
+        idx = np.minimum(np.searchsorted(sorted_keys, nb), n - 1)
+        hit = sorted_keys[idx] == nb
+        src.append(np.flatnonzero(hit))
+        dst.append(order[idx[hit]])
+    src, dst = np.concatenate(src), np.concatenate(dst)
+
+    parent = np.arange(n)
+    while len(src):
+        # Hook each larger root onto the smallest root it touches
+        a, b = parent[src], parent[dst]
+        active = a != b
+        src, dst, a, b = src[active], dst[active], a[active], b[active]
+        if not len(src):
+            break
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        by_root = np.argsort(hi, kind='stable')
+        hi, lo = hi[by_root], lo[by_root]
+        starts = np.flatnonzero(np.r_[True, hi[1:] != hi[:-1]])
+        roots = hi[starts]
+        parent[roots] = np.minimum(parent[roots], np.minimum.reduceat(lo, starts))
+
+        # Compress every path so parent always points at a root
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+    labels = np.unique(parent, return_inverse=True)[1].ravel()
+    return labels, np.bincount(labels)
+
+
+# ---------------------------- GENERATORS ----------------------------------
+
+GRADIENTS = np.array([
+    (1, 1, 0), (-1, 1, 0), (1, -1, 0), (-1, -1, 0),
+    (1, 0, 1), (-1, 0, 1), (1, 0, -1), (-1, 0, -1),
+    (0, 1, 1), (0, -1, 1), (0, 1, -1), (0, -1, -1),
+    (1, 1, 0), (-1, 1, 0), (0, -1, 1), (0, -1, -1),
+], dtype=np.float32)
+
+
+def lattice_hash(ix, iy, iz, seed):
+    u = np.uint32
+    h = (ix.astype(u) * u(0x8DA6B343)) ^ (iy.astype(u) * u(0xD8163841)) ^ (iz.astype(u) * u(0xCB1AB31F))
+    h = h ^ u((seed * 0x9E3779B9) & 0xFFFFFFFF)
+    h ^= h >> u(15)
+    h *= u(0x2C1B3C6D)
+    h ^= h >> u(12)
+    h *= u(0x297A2D39)
+    h ^= h >> u(15)
+    return h
+
+
+def fade(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def lattice_noise(x, y, z, seed, gradient):
+    """Value or Perlin noise in [0, 1] at broadcastable coordinate arrays"""
+    ix, iy, iz = np.floor(x), np.floor(y), np.floor(z)
+    fx, fy, fz = x - ix, y - iy, z - iz
+    ix, iy, iz = ix.astype(np.int64), iy.astype(np.int64), iz.astype(np.int64)
+
+    def corner(dx, dy, dz):
+        h = lattice_hash(ix + dx, iy + dy, iz + dz, seed)
+        if not gradient:
+            return h * np.float32(1.0 / 4294967296.0)
+        g = GRADIENTS[h & 15]
+        return g[..., 0] * (fx - dx) + g[..., 1] * (fy - dy) + g[..., 2] * (fz - dz)
+
+    u, v, w = fade(fx), fade(fy), fade(fz)
+    lerp = lambda a, b, t: a + (b - a) * t
+    x00 = lerp(corner(0, 0, 0), corner(1, 0, 0), u)
+    x10 = lerp(corner(0, 1, 0), corner(1, 1, 0), u)
+    x01 = lerp(corner(0, 0, 1), corner(1, 0, 1), u)
+    x11 = lerp(corner(0, 1, 1), corner(1, 1, 1), u)
+    result = lerp(lerp(x00, x10, v), lerp(x01, x11, v), w)
+    return result * 0.5 + 0.5 if gradient else result
+
+
+def fractal_noise(x, y, z, seed, gradient, octaves):
+    total = 0.0
+    amplitude = 1.0
+    norm = 0.0
+    for octave in range(octaves):
+        scale = 2 ** octave
+        total = total + amplitude * lattice_noise(x * scale, y * scale, z * scale, seed + octave, gradient)
+        norm += amplitude
+        amplitude *= 0.5
+    return total / norm
+
+
+# ------------------------- CELLULAR AUTOMATA ------------------------------
+
+def neighbour_counts(mask):
+    # 3x3x3 box sum as three separable passes, minus the cell itself
+    counts = mask.astype(np.uint8)
+    for axis in range(3):
+        lead = [slice(None)] * 3
+        trail = [slice(None)] * 3
+        lead[axis], trail[axis] = slice(1, None), slice(None, -1)
+        summed = counts.copy()
+        summed[tuple(lead)] += counts[tuple(trail)]
+        summed[tuple(trail)] += counts[tuple(lead)]
+        counts = summed
+    return counts - mask
+
+
+def parse_rule(text):
+    """Turn a rule such as "4,6-8" into a 27 entry lookup table of neighbour counts"""
+    table = np.zeros(27, dtype=bool)
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        start, end = int(start), int(end or start)
+        if not 0 <= start <= end <= 26:
+            raise ValueError(part)
+        table[start:end + 1] = True
+    return table
+
+
+def run_automaton(mask, inside, birth, survival, iterations):
+    for _ in range(iterations):
+        counts = neighbour_counts(mask)
+        mask = np.where(mask, survival[counts], birth[counts]) & inside
+    return mask
+
+
+# ---------------------------- SURFACE NETS --------------------------------
+
+# Dual cell corners and the 12 edges between them
+NET_CORNERS = np.array(list(np.ndindex(2, 2, 2)))
+NET_EDGES = [(i, j) for i in range(8) for j in range(i + 1, 8) if np.abs(NET_CORNERS[i] - NET_CORNERS[j]).sum() == 1]
+
+
+def box_blur(field):
+    for axis in range(3):
+        lead = [slice(None)] * 3
+        trail = [slice(None)] * 3
+        lead[axis], trail[axis] = slice(1, None), slice(None, -1)
+        blurred = field.copy()
+        blurred[tuple(lead)] += field[tuple(trail)]
+        blurred[tuple(trail)] += field[tuple(lead)]
+        field = blurred / 3.0
+    return field
+
+
+def surface_net_block(store, own_lo, own_hi, passes, iso):
+    """Quads (as packed dual cell keys) and vertex positions for lattice edges starting in a block"""
+    # Blurring spoils one ring per pass, the dual cells need one more on each side
+    halo = passes + 2
+    lo = own_lo - halo
+    field = (store.read_region(lo, own_hi + halo) != 0).astype(np.float32)
+    for _ in range(passes):
+        field = box_blur(field)
+    inside = field >= iso
+
+    own = tuple(slice(halo, halo + n) for n in own_hi - own_lo)
+    quads = []
+    for axis in range(3):
+        b, c = (axis + 1) % 3, (axis + 2) % 3
+        ahead = [slice(s.start, s.stop) for s in own]
+        ahead[axis] = slice(own[axis].start + 1, own[axis].stop + 1)
+        v0, v1 = inside[own], inside[tuple(ahead)]
+        edges = np.argwhere(v0 != v1) + own_lo
+        if not len(edges):
+            continue
+
+        # The four dual cells around each edge, wound so the face points outward
+        eb, ec = np.eye(3, dtype=np.int64)[b], np.eye(3, dtype=np.int64)[c]
+        ring = np.stack((edges, edges - eb, edges - eb - ec, edges - ec), axis=1)
+        flip = ~v0[tuple((edges - own_lo).T)]
+        ring[flip] = ring[flip][:, ::-1]
+        quads.append(ring)
+
+    if not quads:
+        return np.zeros((0, 4), dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros((0, 3), dtype=np.float32)
+    quads = np.concatenate(quads)
+
+    # Each dual cell vertex sits at the mean of its iso crossings
+    keys, inverse = np.unique(pack_coords(quads.reshape(-1, 3) + 2), return_inverse=True)
+    cells = unpack_coords(keys) - 2
+    local = cells - lo
+    values = np.stack([field[tuple((local + corner).T)] for corner in NET_CORNERS], axis=1)
+    total = np.zeros((len(cells), 3), dtype=np.float32)
+    count = np.zeros(len(cells), dtype=np.float32)
+    for i, j in NET_EDGES:
+        vi, vj = values[:, i], values[:, j]
+        cross = (vi >= iso) != (vj >= iso)
+        t = np.where(cross, (iso - vi) / np.where(cross, vj - vi, 1.0), 0.0)
+        point = NET_CORNERS[i] + t[:, None] * (NET_CORNERS[j] - NET_CORNERS[i])
+        total += np.where(cross[:, None], point, 0.0)
+        count += cross
+    verts = cells + 0.5 + total / np.maximum(count, 1)[:, None]
+    return inverse.reshape(-1, 4), keys, verts.astype(np.float32)
+
+
+def surface_net(store, dims, passes=2, iso=0.5):
+    """Smooth surface of the volume as welded vertices and quads"""
+    all_quads, all_keys, all_verts = [], [], []
+    for origin, hi in store.grid_blocks(dims):
+        # Edges that leave the grid's low side belong to the first blocks
+        own_lo = np.where(origin == 0, -1, origin)
+        quads, keys, verts = surface_net_block(store, own_lo, hi, passes, iso)
+        all_quads.append(keys[quads])
+        all_keys.append(keys)
+        all_verts.append(verts)
+
+    keys = np.concatenate(all_keys)
+    if not len(keys):
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 4), dtype=np.int32)
+
+    # Neighbouring blocks compute identical vertices for shared dual cells
+    unique, first = np.unique(keys, return_index=True)
+    verts = np.concatenate(all_verts)[first]
+    quads = np.searchsorted(unique, np.concatenate(all_quads))
+    return verts, quads.astype(np.int32)
+
+
+# ------------------------------- LOD --------------------------------------
+
+FACE_NEIGHBOURS = [(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)]
+
+
+def chunk_neighbours(key):
+    return [tuple(np.add(key, offset).tolist()) for offset in FACE_NEIGHBOURS]
+
+
+def block_quads(blocks, key, size):
+    # Culled surface of one block, with the neighbouring blocks as the halo
+    piece = np.argwhere(blocks[key]) + np.multiply(key, size)
+    solid = [piece] + [np.argwhere(blocks[nb]) + np.multiply(nb, size)
+                       for nb in chunk_neighbours(key) if nb in blocks]
+    return surface_quads(piece, np.concatenate(solid))
+
+
+def lod_chunk_quads(store, key, level, reduce='ANY'):
+    """Culled surface of one chunk at a LOD level, scaled back to world units"""
+    blocks = store.lod(level, reduce)
+    verts, quads = block_quads(blocks, key, CHUNK_SIZE >> level)
+    return verts * (1 << level), quads
+
+
+def surface_chunks(store, level=0, reduce='ANY'):
+    """Yield the culled surface of the whole volume one chunk at a time"""
+    blocks = store.lod(level, reduce)
+    for key in sorted(blocks):
+        verts, quads = block_quads(blocks, key, CHUNK_SIZE >> level)
+        if len(quads):
+            yield verts * (1 << level), quads
+
+
+def lod_for_distance(distance, lod_distance):
+    # Full detail up to lod_distance, then one level coarser per doubling
+    if distance <= lod_distance:
+        return 0
+    return min(LOD_LEVELS, int(np.log2(distance / lod_distance)) + 1)
+
+
+def view_location(context):
+    space = context.space_data
+    if space and space.type == 'VIEW_3D':
+        return np.array(space.region_3d.view_matrix.inverted().translation)
+    if context.scene.camera:
+        return np.array(context.scene.camera.matrix_world.translation)
+    return np.zeros(3)
+
+
+def sync_chunk_meshes(collection, store, level_for, reduce='ANY', keys=None):
+    """Rebuild the per-chunk meshes of a collection whose chunk, neighbours or level changed
+
+    keys limits the check to those chunks (e.g. the ones an edit touched); by default every
+    chunk is checked and meshes of chunks no longer in the store are removed.
+    """
+    def mesh_name(key):
+        return "{}_{}_{}_{}".format(collection.name, *key)
+
+    if keys is None:
+        keys = list(store.chunks)
+        existing = {obj.name: obj for obj in collection.objects}
+    else:
+        # Emptied chunks leave the store, but their old meshes still need removing
+        existing = {name: collection.objects.get(name) for name in map(mesh_name, keys)}
+        existing = {name: obj for name, obj in existing.items() if obj}
+        keys = [key for key in keys if key in store.chunks]
+    wanted = set()
+    rebuilt = 0
+    for key in keys:
+        level = level_for(key)
+        name = mesh_name(key)
+
+        # Border faces depend on the neighbours, so their edits count too
+        signature = str((level, reduce, [store.versions.get(k) for k in [key] + chunk_neighbours(key)]))
+        obj = existing.get(name)
+        if obj and obj.get("voxel_lod") == signature:
+            wanted.add(name)
+            continue
+        if key not in store.lod(level, reduce):
+            continue
+
+        mesh = mesh_from_quads(name, *lod_chunk_quads(store, key, level, reduce))
+        if obj:
+            old, obj.data = obj.data, mesh
+            bpy.data.meshes.remove(old)
+        else:
+            obj = bpy.data.objects.new(name, mesh)
+            collection.objects.link(obj)
+        obj["voxel_lod"] = signature
+        wanted.add(name)
+        rebuilt += 1
+
+    stale = [obj for name, obj in existing.items() if name not in wanted]
+    if stale:
+        bpy.data.batch_remove(stale + [obj.data for obj in stale])
+    return rebuilt, len(wanted)
+
+
+# ---------------------------- RESAMPLING ----------------------------------
+
+def nearest_index(old, new):
+    return np.minimum(((np.arange(new) + 0.5) * old / new).astype(np.int64), old - 1)
+
+
+def average_axis(values, axis, new):
+    # Mean over each target cell's source span; upsampling repeats the nearest cell
+    old = values.shape[axis]
+    starts = (np.arange(new) * old) // new
+    counts = np.maximum(np.diff(np.r_[starts, old]), 1)
+    shape = [1, 1, 1]
+    shape[axis] = -1
+    return np.add.reduceat(values, starts, axis=axis) / counts.reshape(shape)
+
+
+def linear_axis(values, axis, new):
+    old = values.shape[axis]
+    pos = np.clip((np.arange(new) + 0.5) * old / new - 0.5, 0, old - 1)
+    i0 = np.floor(pos).astype(np.int64)
+    i1 = np.minimum(i0 + 1, old - 1)
+    shape = [1, 1, 1]
+    shape[axis] = -1
+    t = (pos - i0).astype(np.float32).reshape(shape)
+    return np.take(values, i0, axis=axis) * (1 - t) + np.take(values, i1, axis=axis) * t
+
+
+def resample_grid(grid, new_dims, mode):
+    """Resample a value grid to new_dims by nearest cell, majority vote or smoothed threshold"""
+    nearest = grid
+    for axis, new in enumerate(new_dims):
+        nearest = np.take(nearest, nearest_index(grid.shape[axis], new), axis=axis)
+
+    if mode == 'NEAREST':
+        occupied = nearest != 0
+    else:
+        field = (grid != 0).astype(np.float32)
+        if mode == 'SMOOTH':
+            field = box_blur(field)
+        sample = average_axis if mode == 'MAJORITY' else linear_axis
+        for axis, new in enumerate(new_dims):
+            field = sample(field, axis, new)
+        occupied = field >= 0.5
+
+    return np.where(occupied, np.maximum(nearest, 1), 0).astype(np.uint8)
+
+
+# --------------------------- BVOX FORMAT ----------------------------------
+
+# header: magic, version, chunk size, grid dims, chunk count
+BVOX_MAGIC = b"BVOX"
+BVOX_HEADER = struct.Struct("<4sHH3II")
+BVOX_INDEX = np.dtype([
+    ("key", "<i4", 3), ("offset", "<u8"), ("length", "<u4"), ("codec", "u1"), ("encoding", "u1"), ("pad", "u2"),
+])
+BVOX_CODECS = {0: (zlib.compress, zlib.decompress), 1: (lzma.compress, lzma.decompress)}
+BVOX_BITSET, BVOX_RLE = 0, 1
+
+
+def encode_chunk(chunk):
+    # Plain occupancy packs to a bitset, anything with more values is run-length coded
+    flat = chunk.ravel()
+    if flat.max() <= 1:
+        return BVOX_BITSET, np.packbits(flat).tobytes()
+    starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]])
+    lengths = np.diff(np.r_[starts, flat.size]).astype("<u2")
+    return BVOX_RLE, struct.pack("<I", len(starts)) + flat[starts].tobytes() + lengths.tobytes()
+
+
+def decode_chunk(encoding, payload):
+    size = CHUNK_SIZE ** 3
+    if encoding == BVOX_BITSET:
+        flat = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=size)
+    else:
+        (runs,) = struct.unpack_from("<I", payload)
+        values = np.frombuffer(payload, dtype=np.uint8, count=runs, offset=4)
+        lengths = np.frombuffer(payload, dtype="<u2", count=runs, offset=4 + runs)
+        flat = np.repeat(values, lengths)
+    return flat.reshape((CHUNK_SIZE,) * 3)
+
+
+def write_bvox(stream, chunks, dims, codec=0):
+    compress = BVOX_CODECS[codec][0]
+    keys = sorted(chunks)
+    index = np.zeros(len(keys), dtype=BVOX_INDEX)
+    payloads = []
+    offset = BVOX_HEADER.size + index.nbytes
+    for i, key in enumerate(keys):
+        encoding, raw = encode_chunk(chunks[key])
+        payload = compress(raw)
+        index[i] = (key, offset, len(payload), codec, encoding, 0)
+        payloads.append(payload)
+        offset += len(payload)
+
+    stream.write(BVOX_HEADER.pack(BVOX_MAGIC, 1, CHUNK_SIZE, *dims, len(keys)))
+    stream.write(index.tobytes())
+    for payload in payloads:
+        stream.write(payload)
+
+
+class BvoxReader:
+    """Random access to the chunks of a .bvox stream"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        magic, version, chunk_size, dx, dy, dz, count = BVOX_HEADER.unpack(stream.read(BVOX_HEADER.size))
+        if magic != BVOX_MAGIC or version != 1 or chunk_size != CHUNK_SIZE:
+            raise ValueError("Unsupported .bvox file")
+        self.dims = (dx, dy, dz)
+        table = np.frombuffer(stream.read(count * BVOX_INDEX.itemsize), dtype=BVOX_INDEX)
+        if len(table) != count:
+            raise ValueError("Truncated chunk index")
+        if not np.isin(table["codec"], list(BVOX_CODECS)).all():
+            raise ValueError("unknown codec")
+        if not np.isin(table["encoding"], (BVOX_BITSET, BVOX_RLE)).all():
+            raise ValueError("unknown chunk encoding")
+        self.index = {tuple(row["key"].tolist()): row for row in table}
+
+    def read_chunk(self, key):
+        row = self.index[key]
+        self.stream.seek(int(row["offset"]))
+        raw = BVOX_CODECS[int(row["codec"])][1](self.stream.read(int(row["length"])))
+        return decode_chunk(int(row["encoding"]), raw)
+
+    def chunks(self):
+        # Decompressed lazily, so a reader's chunks can stream into a budgeted store
+        for key in self.index:
+            yield key, self.read_chunk(key)
+
+
+# --------------------------- MAGICAVOXEL ----------------------------------
+
+VOX_MODEL_SIZE = 256
+
+
+def vox_chunk(chunk_id, content, children=b""):
+    return chunk_id + struct.pack("<II", len(content), len(children)) + content + children
+
+
+def vox_dict(items):
+    out = [struct.pack("<i", len(items))]
+    for key, value in items.items():
+        for text in (key.encode(), value.encode()):
+            out.append(struct.pack("<i", len(text)) + text)
+    return b"".join(out)
+
+
+def read_vox_dict(data, pos):
+    (count,) = struct.unpack_from("<i", data, pos)
+    pos += 4
+    items = {}
+    for _ in range(count):
+        pair = []
+        for _ in range(2):
+            (size,) = struct.unpack_from("<i", data, pos)
+            pair.append(data[pos + 4:pos + 4 + size].decode(errors="replace"))
+            pos += 4 + size
+        items[pair[0]] = pair[1]
+    return items, pos
+
+
+def read_vox(data):
+    """Return coordinates (in the file's scene space), colour indices and palette (or None) of a .vox file"""
+    if data[:4] != b"VOX ":
+        raise ValueError("Not a MagicaVoxel file")
+    sizes, models, nodes, palette = [], [], {}, None
+    pos = 20  # skip the magic, version and MAIN chunk header
+    while pos + 12 <= len(data):
+        chunk_id, content_size, _ = struct.unpack_from("<4sII", data, pos)
+        start = pos + 12
+        pos = start + content_size
+        if chunk_id == b"SIZE":
+            sizes.append(np.frombuffer(data, dtype="<i4", count=3, offset=start))
+        elif chunk_id == b"XYZI":
+            (count,) = struct.unpack_from("<i", data, start)
+            models.append(np.frombuffer(data, dtype=np.uint8, count=4 * count, offset=start + 4).reshape(-1, 4))
+        elif chunk_id == b"RGBA":
+            palette = np.frombuffer(data, dtype=np.uint8, count=1024, offset=start).reshape(256, 4).copy()
+        elif chunk_id in (b"nTRN", b"nGRP", b"nSHP"):
+            (node_id,) = struct.unpack_from("<i", data, start)
+            _, at = read_vox_dict(data, start + 4)
+            if chunk_id == b"nTRN":
+                child, _, _, frames = struct.unpack_from("<iiii", data, at)
+                frame = read_vox_dict(data, at + 16)[0] if frames else {}
+                offset = np.array(frame.get("_t", "0 0 0").split(), dtype=np.int64)
+                nodes[node_id] = ('T', [child], offset)
+            else:
+                (count,) = struct.unpack_from("<i", data, at)
+                if chunk_id == b"nGRP":
+                    children = list(struct.unpack_from(f"<{count}i", data, at + 4))
+                    nodes[node_id] = ('G', children, None)
+                else:
+                    shapes, at = [], at + 4
+                    for _ in range(count):
+                        shapes.append(struct.unpack_from("<i", data, at)[0])
+                        at = read_vox_dict(data, at + 4)[1]
+                    nodes[node_id] = ('S', shapes, None)
+
+    # Place models through the scene graph, or side by side in older files
+    placed = []
+    if 0 in nodes:
+        stack, seen = [(0, np.zeros(3, dtype=np.int64))], set()
+        while stack:
+            node_id, offset = stack.pop()
+            if node_id in seen:
+                raise ValueError(f"Scene graph node {node_id} is reached twice")
+            seen.add(node_id)
+            kind, children, translation = nodes.get(node_id, ('G', [], None))
+            if kind == 'S':
+                placed.extend((model, offset - sizes[model] // 2) for model in children if model < len(models))
+                continue
+            if kind == 'T':
+                offset = offset + translation
+            stack.extend((child, offset) for child in children)
+    else:
+        x = 0
+        for model, size in enumerate(sizes[:len(models)]):
+            placed.append((model, np.array([x, 0, 0])))
+            x += int(size[0]) + 1
+
+    if not placed:
+        return np.zeros((0, 3), dtype=np.int64), np.zeros(0, dtype=np.uint8), palette
+    coords = np.concatenate([models[model][:, :3].astype(np.int64) + offset for model, offset in placed])
+    values = np.concatenate([models[model][:, 3] for model, _ in placed])
+    return coords, values, palette
+
+
+def write_vox(stream, coords, values, palette=None):
+    """Write cells as a .vox file, split into 256^3 models placed by a scene graph"""
+    # Tiles may be negative after an imported model's offset is added back
+    tiles = np.floor_divide(coords, VOX_MODEL_SIZE)
+    first = tiles.min(axis=0) if len(tiles) else np.zeros(3, dtype=np.int64)
+    unique, inverse = np.unique(pack_coords(tiles - first), return_inverse=True)
+    if not len(unique):
+        unique = np.zeros(1, dtype=np.int64)
+
+    models, shapes = [], []
+    for i, tile in enumerate(unpack_coords(unique) + first):
+        rows = inverse.ravel() == i
+        origin = tile * VOX_MODEL_SIZE
+        size = coords[rows].max(axis=0) - origin + 1 if rows.any() else np.ones(3, dtype=np.int64)
+        xyzi = np.empty((int(rows.sum()), 4), dtype=np.uint8)
+        xyzi[:, :3] = coords[rows] - origin
+        xyzi[:, 3] = values[rows]
+        models.append(vox_chunk(b"SIZE", struct.pack("<3i", *size.tolist())))
+        models.append(vox_chunk(b"XYZI", struct.pack("<i", len(xyzi)) + xyzi.tobytes()))
+
+        translation = " ".join(map(str, (origin + size // 2).tolist()))
+        shape_node = 3 + 2 * i
+        shapes.append(vox_chunk(b"nTRN", struct.pack("<i", shape_node - 1) + vox_dict({})
+                                + struct.pack("<iiii", shape_node, -1, 0, 1) + vox_dict({"_t": translation})))
+        shapes.append(vox_chunk(b"nSHP", struct.pack("<i", shape_node) + vox_dict({})
+                                + struct.pack("<ii", 1, i) + vox_dict({})))
+
+    count = len(shapes) // 2
+    graph = [
+        vox_chunk(b"nTRN", struct.pack("<i", 0) + vox_dict({}) + struct.pack("<iiii", 1, -1, -1, 1) + vox_dict({})),
+        vox_chunk(b"nGRP", struct.pack("<i", 1) + vox_dict({}) + struct.pack(f"<i{count}i", count, *range(2, 2 + 2 * count, 2))),
+    ]
+    children = b"".join(models + graph + shapes)
+    if palette is not None:
+        children += vox_chunk(b"RGBA", np.ascontiguousarray(palette, dtype=np.uint8).tobytes())
+
+    stream.write(b"VOX " + struct.pack("<i", 150))
+    stream.write(vox_chunk(b"MAIN", b"", children))
+
+
+# ---------------------------- MESH EXPORT ---------------------------------
+
+STL_TRIANGLE = np.dtype([("normal", "<f4", 3), ("verts", "<f4", (3, 3)), ("attr", "<u2")])
+
+
+def write_stl(stream, pieces, scale=1.0):
+    """Stream (verts, quads) pieces to a binary STL and return the triangle count"""
+    stream.write(b"BlendVoxel".ljust(80, b" ") + struct.pack("<I", 0))
+    total = 0
+    for verts, quads in pieces:
+        corners = verts[quads[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 3)] * scale
+        normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        tris = np.zeros(len(corners), dtype=STL_TRIANGLE)
+        tris["normal"] = normals / np.linalg.norm(normals, axis=1, keepdims=True)
+        tris["verts"] = corners
+        stream.write(tris.tobytes())
+        total += len(tris)
+
+    # The count sits before the triangles, so patch it once they are all written
+    stream.seek(80)
+    stream.write(struct.pack("<I", total))
+    return total
+
+
+def write_obj(stream, pieces, scale=1.0):
+    """Stream (verts, quads) pieces to an OBJ, welding the corners shared across chunk seams"""
+    stream.write(b"# BlendVoxel surface\n")
+    seam = {}
+    count = faces = 0
+    for verts, quads in pieces:
+        ints = np.rint(verts).astype(np.int64)
+        on_seam = np.flatnonzero((ints % CHUNK_SIZE == 0).any(axis=1))
+        seam_keys = pack_coords(ints[on_seam]).tolist()
+        known = np.array([seam.get(k, -1) for k in seam_keys], dtype=np.int64)
+
+        index = np.full(len(verts), -1, dtype=np.int64)
+        index[on_seam] = known
+        fresh = index < 0
+        index[fresh] = np.arange(count, count + int(fresh.sum()))
+        count += int(fresh.sum())
+        seam.update((k, i) for k, i, old in zip(seam_keys, index[on_seam].tolist(), known.tolist()) if old < 0)
+
+        np.savetxt(stream, verts[fresh] * scale, fmt="v %.6g %.6g %.6g")
+        np.savetxt(stream, index[quads] + 1, fmt="f %d %d %d %d")
+        faces += len(quads)
+    return faces
+
+
+# ------------------------------- GLTF -------------------------------------
+
+GL_FLOAT, GL_UNSIGNED_INT = 5126, 5125
+GL_ARRAY_BUFFER, GL_ELEMENT_ARRAY_BUFFER = 34962, 34963
+
+# Corners and outward triangles of a unit cube centred on the origin
+CUBE_CORNERS = np.array([(x, y, z) for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)], dtype=np.float32)
+CUBE_TRIANGLES = np.array([
+    (4, 6, 7), (4, 7, 5), (0, 1, 3), (0, 3, 2), (2, 3, 7), (2, 7, 6),
+    (0, 4, 5), (0, 5, 1), (1, 5, 7), (1, 7, 3), (0, 2, 6), (0, 6, 4),
+], dtype=np.uint32)
+
+
+def y_up(points):
+    # Blender is Z-up, glTF is Y-up
+    return np.ascontiguousarray(np.stack((points[:, 0], points[:, 2], -points[:, 1]), axis=1), dtype=np.float32)
+
+
+def gltf_accessor(doc, blobs, array, component, kind, target=None):
+    offset = sum(len(blob) for blob in blobs)
+    data = array.tobytes()
+    blobs.append(data + b"\0" * (-len(data) % 4))
+    view = {"buffer": 0, "byteOffset": offset, "byteLength": len(data)}
+    if target:
+        view["target"] = target
+    doc["bufferViews"].append(view)
+
+    accessor = {"bufferView": len(doc["bufferViews"]) - 1, "componentType": component, "count": len(array),
+                "type": kind}
+    if kind == "VEC3":
+        accessor["min"] = array.min(axis=0).tolist()
+        accessor["max"] = array.max(axis=0).tolist()
+    doc["accessors"].append(accessor)
+    return len(doc["accessors"]) - 1
+
+
+def gltf_document(verts, triangles, translations=None):
+    """glTF JSON and binary chunks for one mesh, optionally instanced at every translation"""
+    doc = {
+        "asset": {"version": "2.0", "generator": "BlendVoxel"},
+        "scene": 0, "scenes": [{"nodes": [0]}],
+        "meshes": [], "accessors": [], "bufferViews": [],
+    }
+    blobs = []
+    position = gltf_accessor(doc, blobs, y_up(verts), GL_FLOAT, "VEC3", GL_ARRAY_BUFFER)
+    indices = gltf_accessor(doc, blobs, triangles.astype(np.uint32).ravel(), GL_UNSIGNED_INT, "SCALAR",
+                            GL_ELEMENT_ARRAY_BUFFER)
+    doc["meshes"].append({"primitives": [{"attributes": {"POSITION": position}, "indices": indices}]})
+    node = {"name": "Voxels", "mesh": 0}
+    if translations is not None:
+        offsets = gltf_accessor(doc, blobs, y_up(translations), GL_FLOAT, "VEC3")
+        node["extensions"] = {"EXT_mesh_gpu_instancing": {"attributes": {"TRANSLATION": offsets}}}
+        doc["extensionsUsed"] = doc["extensionsRequired"] = ["EXT_mesh_gpu_instancing"]
+    doc["nodes"] = [node]
+    return doc, blobs
+
+
+def write_glb(stream, doc, blobs):
+    binary = b"".join(blobs)
+    doc["buffers"] = [{"byteLength": len(binary)}]
+    text = json.dumps(doc, separators=(",", ":")).encode()
+    text += b" " * (-len(text) % 4)
+    stream.write(struct.pack("<4sII", b"glTF", 2, 12 + 8 + len(text) + 8 + len(binary)))
+    stream.write(struct.pack("<I4s", len(text), b"JSON") + text)
+    stream.write(struct.pack("<I4s", len(binary), b"BIN\0"))
+    stream.write(binary)
+
+
+# ------------------------------- NUMPY ------------------------------------
+
+def write_npy(path, store, dims, occupancy=False):
+    """Write the grid as a dense .npy, filling a memory-mapped file one chunk at a time"""
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=tuple(dims))
+    for origin, hi in store.grid_blocks(dims):
+        block = store.read_region(origin, hi)
+        if block.any():
+            out[tuple(slice(a, b) for a, b in zip(origin, hi))] = block != 0 if occupancy else block
+    out.flush()
+    del out
+
+
+def array_chunks(array, threshold=0.5):
+    """Yield the (key, chunk) pairs of a dense (possibly memory-mapped) array, paging in one chunk at a time"""
+    if array.ndim != 3:
+        raise ValueError("Expected a 3D array")
+    for origin, hi in VoxelStore().grid_blocks(array.shape):
+        block = np.asarray(array[tuple(slice(a, b) for a, b in zip(origin, hi))])
+        # Floats are densities, integers are values and bools are occupancy
+        if block.dtype.kind == 'f':
+            block = block > threshold
+        block = np.clip(block, 0, 255).astype(np.uint8)
+        if block.any():
+            chunk = np.zeros((CHUNK_SIZE,) * 3, dtype=np.uint8)
+            chunk[tuple(slice(0, n) for n in block.shape)] = block
+            yield tuple((origin // CHUNK_SIZE).tolist()), chunk
+
+
+def write_npz(path, store, dims):
+    coords, values = store.cells()
+    np.savez_compressed(path, coords=coords.astype(np.int32), values=values, dims=np.array(dims, dtype=np.int64))
+
+
+def read_volume_array(path, threshold=0.5):
+    """Return (key, chunk) pairs and grid dims from a dense .npy or sparse .npz file"""
+    if path.lower().endswith(".npz"):
+        with np.load(path) as data:
+            if "coords" not in data:
+                array = data[data.files[0]]
+                return array_chunks(array, threshold), array.shape
+            coords = data["coords"].astype(np.int64)
+            dims = data["dims"] if "dims" in data else (coords.max(axis=0) + 1 if len(coords) else (1, 1, 1))
+            return cell_chunks(coords, data["values"]), tuple(dims)
+
+    array = np.load(path, mmap_mode='r')
+    return array_chunks(array, threshold), array.shape
+
+
+# ------------------------------- BINVOX -----------------------------------
+
+def binvox_rle(flat):
+    # (value, count) byte pairs, runs longer than 255 split into several pairs
+    starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]])
+    lengths = np.diff(np.r_[starts, flat.size])
+    pieces = (lengths + 254) // 255
+    run = np.repeat(np.arange(len(starts)), pieces)
+    within = np.arange(len(run)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    pairs = np.empty((len(run), 2), dtype=np.uint8)
+    pairs[:, 0] = flat[starts][run]
+    pairs[:, 1] = np.minimum(255, lengths[run] - within * 255)
+    return pairs.tobytes()
+
+
+def read_binvox(data, up_axis='Y'):
+    """Return the occupancy grid of a .binvox file on the Blender grid axes"""
+    header_end = data.find(b"data\n")
+    if not data.startswith(b"#binvox") or header_end < 0:
+        raise ValueError("Not a binvox file")
+    dims = None
+    for line in data[:header_end].decode().splitlines():
+        if line.startswith("dim"):
+            dims = tuple(int(n) for n in line.split()[1:4])
+    if dims is None:
+        raise ValueError("Missing binvox dimensions")
+
+    pairs = np.frombuffer(data, dtype=np.uint8, offset=header_end + 5).reshape(-1, 2)
+    flat = np.repeat(pairs[:, 0], pairs[:, 1])
+    if flat.size != np.prod(dims):
+        raise ValueError("Truncated binvox data")
+
+    # Stored x-z-y with y fastest; binvox y is up, Blender z is
+    raw = flat.reshape(dims)
+    return raw[:, ::-1, :] if up_axis == 'Y' else raw.transpose(0, 2, 1)
+
+
+def write_binvox(stream, grid, up_axis='Y'):
+    raw = grid[:, ::-1, :] if up_axis == 'Y' else grid.transpose(0, 2, 1)
+    stream.write(f"#binvox 1\ndim {' '.join(map(str, raw.shape))}\ntranslate 0 0 0\nscale {max(raw.shape)}\ndata\n".encode())
+    stream.write(binvox_rle((raw != 0).astype(np.uint8).ravel()))
+
+
+# ------------------------------- SLICES -----------------------------------
+
+# Layer axis, then the image's horizontal and vertical axes, per orientation
+SLICE_AXES = {'XY': (2, 0, 1), 'XZ': (1, 0, 2), 'YZ': (0, 1, 2)}
+
+
+def layer_slices(store, dims, orientation):
+    """Yield (layer, image) along the orientation's normal, reading one chunk-thick slab at a time"""
+    axis, u, v = SLICE_AXES[orientation]
+    for start in range(0, dims[axis], CHUNK_SIZE):
+        lo, hi = [0, 0, 0], list(dims)
+        lo[axis], hi[axis] = start, min(start + CHUNK_SIZE, dims[axis])
+        slab = store.read_region(lo, hi).transpose(axis, v, u)
+        for i, image in enumerate(slab):
+            # PNG rows run top to bottom
+            yield start + i, image[::-1]
+
+
+def png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def png_bytes(image, bits=8):
+    """Encode a 2D occupancy image as a greyscale PNG, 1 bit or 8 bits per pixel"""
+    height, width = image.shape
+    filled = image != 0
+    rows = np.packbits(filled, axis=1) if bits == 1 else filled.astype(np.uint8) * 255
+    # Every scanline starts with filter type 0
+    raw = np.hstack((np.zeros((height, 1), dtype=np.uint8), rows)).tobytes()
+    return (b"\x89PNG\r\n\x1a\n"
+            + png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, bits, 0, 0, 0, 0))
+            + png_chunk(b"IDAT", zlib.compress(raw))
+            + png_chunk(b"IEND", b""))
+
+
+# ---------------------------- CLIPBOARD -----------------------------------
+
+_clipboard = {}
+
+ROTATE_AXES = {'X': (1, 2), 'Y': (2, 0), 'Z': (0, 1)}
+
+
+def clip_block(lo, block, dims):
+    # Crop a block placed at lo so it lies inside the master grid
+    lo = np.asarray(lo)
+    a = np.maximum(lo, 0)
+    b = np.minimum(lo + block.shape, dims)
+    if np.any(b <= a):
+        return a, None
+    return a, block[tuple(slice(s, e) for s, e in zip(a - lo, b - lo))]
+
 
 # --------------------------- UI PANEL -------------------------------------
 
@@ -179,14 +2275,106 @@ class VoxelGridPanel(bpy.types.Panel):
         if props.shape_mode != 'SINGLE':
             layout.prop(props, "brush_radius")
         row = layout.row(align=True)
+        row.label(text="Mirror:")
+        row.prop(props, "mirror_x", toggle=True)
+        row.prop(props, "mirror_y", toggle=True)
+        row.prop(props, "mirror_z", toggle=True)
+        row = layout.row(align=True)
         row.operator("voxel.place_voxel", text="Add Voxels")
         row.operator("voxel.erase_voxel", text="Remove Voxels")
+        row = layout.row(align=True)
+        row.operator("voxel.flood_fill", text="Fill Layer").mode = 'LAYER'
+        row.operator("voxel.flood_fill", text="Fill Volume").mode = 'VOLUME'
+        row = layout.row(align=True)
+        row.operator("voxel.box_region", text="Box Select").action = 'SELECT'
+        row.operator("voxel.box_region", text="Box Fill").action = 'FILL'
+        row.operator("voxel.box_region", text="Box Clear").action = 'CLEAR'
+        layout.label(text="Clipboard:")
+        row = layout.row(align=True)
+        row.operator("voxel.box_region", text="Copy").action = 'COPY'
+        row.operator("voxel.box_region", text="Cut").action = 'CUT'
+        row.operator("voxel.paste", text="Paste")
+        row = layout.row(align=True)
+        row.label(text="Rotate:")
+        for axis in "XYZ":
+            op = row.operator("voxel.clipboard_transform", text=axis)
+            op.mode = 'ROTATE'
+            op.axis = axis
+        row = layout.row(align=True)
+        row.label(text="Flip:")
+        for axis in "XYZ":
+            op = row.operator("voxel.clipboard_transform", text=axis)
+            op.mode = 'FLIP'
+            op.axis = axis
+        layout.label(text="Boolean:")
+        layout.prop(props, "boolean_operand")
+        if props.boolean_operand == 'COLLECTION':
+            layout.prop(props, "boolean_collection")
+        row = layout.row(align=True)
+        row.operator("voxel.boolean", text="Union").operation = 'UNION'
+        row.operator("voxel.boolean", text="Intersect").operation = 'INTERSECT'
+        row.operator("voxel.boolean", text="Difference").operation = 'DIFFERENCE'
+        row.operator("voxel.boolean", text="XOR").operation = 'XOR'
+        layout.label(text="Generate:")
+        row = layout.row(align=True)
+        row.operator("voxel.generate", text="Caves").pattern = 'CAVES'
+        row.operator("voxel.generate", text="Terrain").pattern = 'TERRAIN'
+        row.operator("voxel.generate", text="Scatter").pattern = 'SCATTER'
+        layout.label(text="Filters:")
+        layout.operator("voxel.resample", text="Resample")
+        row = layout.row(align=True)
+        row.operator("voxel.morphology", text="Dilate").operation = 'DILATE'
+        row.operator("voxel.morphology", text="Erode").operation = 'ERODE'
+        row.operator("voxel.morphology", text="Open").operation = 'OPEN'
+        row.operator("voxel.morphology", text="Close").operation = 'CLOSE'
+        layout.operator("voxel.morphology", text="Hollow").operation = 'HOLLOW'
+        row = layout.row(align=True)
+        op = row.operator("voxel.automaton", text="Smooth")
+        op.birth, op.survival = "14-26", "13-26"
+        op = row.operator("voxel.automaton", text="Grow")
+        op.birth, op.survival = "3-4", "1-26"
+        row = layout.row(align=True)
+        row.operator("voxel.islands", text="Count Islands").action = 'REPORT'
+        row.operator("voxel.islands", text="Remove Debris").action = 'REMOVE'
+        row.operator("voxel.islands", text="Split Islands").action = 'SPLIT'
+        layout.label(text="Files:")
+        row = layout.row(align=True)
+        row.operator("voxel.import_bvox", text="Load .bvox")
+        row.operator("voxel.export_bvox", text="Save .bvox")
+        row = layout.row(align=True)
+        row.operator("voxel.import_vox", text="Import .vox")
+        row.operator("voxel.export_vox", text="Export .vox")
+        row = layout.row(align=True)
+        row.operator("voxel.export_stl", text="Export .stl")
+        row.operator("voxel.export_obj", text="Export .obj")
+        layout.operator("voxel.export_gltf", text="Export .glb")
+        row = layout.row(align=True)
+        row.operator("voxel.import_array", text="Import .npy/.npz")
+        row.operator("voxel.export_npy", text=".npy")
+        row.operator("voxel.export_npz", text=".npz")
+        row = layout.row(align=True)
+        row.operator("voxel.import_binvox", text="Import .binvox")
+        row.operator("voxel.export_binvox", text="Export .binvox")
+        layout.operator("voxel.export_slices", text="Export Layer Slices")
+        row = layout.row(align=True)
+        row.operator("voxel.undo", text="Undo", icon='LOOP_BACK')
+        row.operator("voxel.redo", text="Redo", icon='LOOP_FORWARDS')
+        layout.prop(props, "undo_memory")
+        layout.prop(props, "memory_budget")
+        layout.prop(props, "compact_storage")
         layout.operator("voxel.make_real", text="Make Voxels Editable")
         layout.operator("voxel.join_and_merge", text="Optimise Voxels").merge_distance = 0.0001
+        layout.operator("voxel.surface", text="Smooth Surface")
+        row = layout.row(align=True)
+        row.operator("voxel.lod_preview", text="LOD Preview")
+        row.operator("voxel.lod_preview", text="", icon='X').remove = True
         layout.label(text="Voxelize Selected Object:")
         row = layout.row(align=True)
         row.prop(props, "voxelize_threshold")
         row.operator("voxel.voxelize_object", text="Voxelize")
+        row = layout.row(align=True)
+        row.prop(props, "cache_dir", text="")
+        row.prop(props, "cache_size", text="Cache MB")
 
 
 # ---------------------- VOXEL PLACEMENT TOOL ------------------------------
@@ -200,14 +2388,19 @@ class VOXEL_OT_place_voxel(bpy.types.Operator):
     def modal(self, context, event):
         if event.type == 'ESC' or event.type == 'RIGHTMOUSE':
             self.dragging = False
+            end_stroke(context)
             return {'CANCELLED'}
 
+        if handle_journal_keys(context, event):
+            return {'RUNNING_MODAL'}
+
         if event.type == 'LEFTMOUSE':
             if event.value == 'PRESS':
                 self.dragging = True
                 self.place_under_cursor(context, event)
             elif event.value == 'RELEASE':
                 self.dragging = False
+                end_stroke(context)
 
         if event.type == 'MOUSEMOVE' and self.dragging:
             self.place_under_cursor(context, event)
@@ -215,104 +2408,13 @@ class VOXEL_OT_place_voxel(bpy.types.Operator):
         return {'RUNNING_MODAL'}
 
     def place_under_cursor(self, context, event):
-        region = context.region
-        rv3d = context.region_data
-        coord = event.mouse_region_x, event.mouse_region_y
-
-        view_vector = view3d_utils.region_2d_to_vector_3d(region, rv3d, coord)
-        ray_origin = view3d_utils.region_2d_to_origin_3d(region, rv3d, coord)
-
         props = context.scene.voxel_grid_props
-        orientation = props.orientation
-        layer = props.current_layer
-
-        # Determine plane normal and point based on orientation
-        if orientation == 'XY':
-            normal = Vector((0, 0, 1))
-            point = Vector((0, 0, layer))
-        elif orientation == 'XZ':
-            normal = Vector((0, 1, 0))
-            point = Vector((0, layer, 0))
-        else:  # 'YZ'
-            normal = Vector((1, 0, 0))
-            point = Vector((layer, 0, 0))
-
-        dot = view_vector.dot(normal)
-        if abs(dot) < 1e-5:
+        cell = layer_cell_under_mouse(context, event)
+        if cell is None or not in_grid(props, *cell):
             return
 
-        t = (point - ray_origin).dot(normal) / dot
-        hit = ray_origin + t * view_vector
-
-        x, y, z = 0, 0, 0
-        if orientation == 'XY':
-            x, y, z = int(hit.x), int(hit.y), layer
-        elif orientation == 'XZ':
-            x, y, z = int(hit.x), layer, int(hit.z)
-        else:  # YZ
-            x, y, z = layer, int(hit.y), int(hit.z)
-
-        if not (0 <= x < props.dim_x and 0 <= y < props.dim_y and 0 <= z < props.dim_z):
-            return
-
-        if props.shape_mode == 'SINGLE':
-            self.add_voxel(x, y, z)
-        else:
-            radius = props.brush_radius  # 1 unit in each direction, can make this a new property
-            for dx in range(-radius, radius + 1):
-                for dy in range(-radius, radius + 1):
-                    if props.shape_mode == 'CIRCLE' and dx * dx + dy * dy > radius * radius:
-                        continue  # skip non-circular points
-
-                    # Map tx, ty, tz based on orientation
-                    if props.orientation == 'XY':
-                        tx = x + dx
-                        ty = y + dy
-                        tz = z
-                    elif props.orientation == 'XZ':
-                        tx = x + dx
-                        ty = y
-                        tz = z + dy
-                    elif props.orientation == 'YZ':
-                        tx = x
-                        ty = y + dx
-                        tz = z + dy
-
-                    # Check bounds
-                    if 0 <= tx < props.dim_x and 0 <= ty < props.dim_y and 0 <= tz < props.dim_z:
-                        self.add_voxel(tx, ty, tz)
-
-    def add_voxel(self, x, y, z):
-        size = 1
-        pos = (x + 0.5, y + 0.5, z + 0.5)
-        name = f"voxel_{x}_{y}_{z}"
-        if name in bpy.data.objects:
-            return
-
-        if "VoxelBase" not in bpy.data.objects:
-            bpy.ops.mesh.primitive_cube_add(size=size, location=(0, 0, 0))
-            base = bpy.context.active_object
-            base.name = "VoxelBase"
-            base.hide_set(True)
-            base.hide_render = True
-            base.display_type = 'WIRE'
-            base.select_set(False)
-        else:
-            base = bpy.data.objects["VoxelBase"]
-
-        inst = bpy.data.objects.new(name, base.data)
-        inst.location = pos
-
-        collection = None
-        for obj in bpy.context.selected_objects:
-            if obj.users_collection:
-                collection = obj.users_collection[0]
-                break
-
-        if collection:
-            collection.objects.link(inst)
-        else:
-            bpy.context.collection.objects.link(inst)
+        store = get_store(context)
+        commit_delta(context, store.set_cells(brush_cells(props, *cell), 1))
 
     def invoke(self, context, event):
         context.window_manager.modal_handler_add(self)
@@ -328,14 +2430,19 @@ class VOXEL_OT_erase_voxel(bpy.types.Operator):
 
     def modal(self, context, event):
         if event.type in {'ESC', 'RIGHTMOUSE'}:
+            end_stroke(context)
             return {'CANCELLED'}
 
+        if handle_journal_keys(context, event):
+            return {'RUNNING_MODAL'}
+
         if event.type == 'LEFTMOUSE':
             if event.value == 'PRESS':
                 self.dragging = True
                 self.remove_voxel(context, event)
             elif event.value == 'RELEASE':
                 self.dragging = False
+                end_stroke(context)
 
         if event.type == 'MOUSEMOVE' and self.dragging:
             self.remove_voxel(context, event)
@@ -343,74 +2450,1065 @@ class VOXEL_OT_erase_voxel(bpy.types.Operator):
         return {'RUNNING_MODAL'}
 
     def remove_voxel(self, context, event):
-        region = context.region
-        rv3d = context.region_data
-        coord = event.mouse_region_x, event.mouse_region_y
+        props = context.scene.voxel_grid_props
+        cell = layer_cell_under_mouse(context, event, offset=0.5)
+        if cell is None:
+            return
+
+        # The store hands back only the cells that really changed, and
+        # commit_delta() removes their objects in a single batch
+        store = get_store(context)
+        commit_delta(context, store.set_cells(brush_cells(props, *cell), 0))
+
+    def invoke(self, context, event):
+        self.dragging = False
+        context.window_manager.modal_handler_add(self)
+        self.report({'INFO'}, "Click and drag to erase voxels | ESC to cancel")
+        return {'RUNNING_MODAL'}
+
+class VOXEL_OT_flood_fill(bpy.types.Operator):
+    """Click a cell to fill or clear its connected region"""
+    bl_idname = "voxel.flood_fill"
+    bl_label = "Flood Fill Voxels"
+    bl_options = {'REGISTER'}
+
+    mode: bpy.props.EnumProperty(
+        name="Fill Mode",
+        items=[
+            ('LAYER', "Layer", "Fill the connected region on the current layer"),
+            ('VOLUME', "Volume", "Fill the connected region across the master grid"),
+        ],
+        default='LAYER'
+    )
+
+    action: bpy.props.EnumProperty(
+        name="Action",
+        items=[
+            ('FILL', "Fill", "Fill the region connected to the clicked cell"),
+            ('CLEAR', "Clear", "Clear the region connected to the clicked cell"),
+        ],
+        default='FILL'
+    )
+
+    def modal(self, context, event):
+        if event.type in {'ESC', 'RIGHTMOUSE'}:
+            return {'CANCELLED'}
+
+        if handle_journal_keys(context, event):
+            return {'RUNNING_MODAL'}
 
-        view_vector = view3d_utils.region_2d_to_vector_3d(region, rv3d, coord)
-        ray_origin = view3d_utils.region_2d_to_origin_3d(region, rv3d, coord)
+        if event.type == 'LEFTMOUSE' and event.value == 'PRESS':
+            self.fill_under_cursor(context, event)
 
+        return {'RUNNING_MODAL'}
+
+    def fill_under_cursor(self, context, event):
         props = context.scene.voxel_grid_props
-        z_layer = props.current_layer
-        orientation = props.orientation
-
-        if orientation == 'XY':
-            plane_normal = Vector((0, 0, 1))
-            plane_point = Vector((0, 0, z_layer + 0.5))
-        elif orientation == 'XZ':
-            plane_normal = Vector((0, 1, 0))
-            plane_point = Vector((0, z_layer + 0.5, 0))
-        elif orientation == 'YZ':
-            plane_normal = Vector((1, 0, 0))
-            plane_point = Vector((z_layer + 0.5, 0, 0))
-        else:
+        cell = layer_cell_under_mouse(context, event, offset=0.5)
+        if cell is None or not in_grid(props, *cell):
             return
 
-        dot = view_vector.dot(plane_normal)
-        if abs(dot) < 1e-5:
+        lo = np.zeros(3, dtype=np.int64)
+        hi = np.array((props.dim_x, props.dim_y, props.dim_z))
+        if self.mode == 'LAYER':
+            axis = {'XY': 2, 'XZ': 1, 'YZ': 0}[props.orientation]
+            lo[axis] = props.current_layer
+            hi[axis] = props.current_layer + 1
+
+        store = get_store(context)
+        grid = store.read_region(lo, hi)
+        mask = flood_region(grid, np.subtract(cell, lo))
+
+        value = 1 if self.action == 'FILL' else 0
+        delta = store.write_region(lo, np.full(grid.shape, value, dtype=np.uint8), mask)
+        if not commit_delta(context, delta):
             return
+        end_stroke(context)
+        self.report({'INFO'}, f"{len(delta[0])} voxels changed.")
 
-        t = (plane_point - ray_origin).dot(plane_normal) / dot
-        hit_point = ray_origin + view_vector * t
+    def invoke(self, context, event):
+        context.window_manager.modal_handler_add(self)
+        self.report({'INFO'}, "Click a cell to flood fill | ESC to stop")
+        return {'RUNNING_MODAL'}
 
-        if orientation == 'XY':
-            x, y, z = int(hit_point.x), int(hit_point.y), z_layer
-        elif orientation == 'XZ':
-            x, y, z = int(hit_point.x), z_layer, int(hit_point.z)
-        elif orientation == 'YZ':
-            x, y, z = z_layer, int(hit_point.y), int(hit_point.z)
+class VOXEL_OT_box_region(bpy.types.Operator):
+    """Drag a box on the current layer to select, fill or clear a 3D region"""
+    bl_idname = "voxel.box_region"
+    bl_label = "Box Region"
+    bl_options = {'REGISTER'}
 
-        name = f"voxel_{x}_{y}_{z}"
-        obj = bpy.data.objects.get(name)
-        if obj:
-            bpy.data.objects.remove(obj, do_unlink=True)
+    action: bpy.props.EnumProperty(
+        name="Action",
+        items=[
+            ('SELECT', "Select", "Select the voxels inside the box"),
+            ('FILL', "Fill", "Fill every cell inside the box"),
+            ('CLEAR', "Clear", "Clear every cell inside the box"),
+            ('COPY', "Copy", "Copy the box to the voxel clipboard"),
+            ('CUT', "Cut", "Copy the box to the voxel clipboard and clear it"),
+        ],
+        default='FILL'
+    )
+
+    depth: bpy.props.IntProperty(
+        name="Depth",
+        default=1,
+        min=1,
+        description="Number of layers the box extends from the current layer"
+    )
+
+    def modal(self, context, event):
+        if event.type in {'ESC', 'RIGHTMOUSE'}:
+            return {'CANCELLED'}
+
+        if handle_journal_keys(context, event):
+            return {'RUNNING_MODAL'}
+
+        if event.type == 'LEFTMOUSE':
+            cell = layer_cell_under_mouse(context, event, offset=0.5)
+            if event.value == 'PRESS':
+                self.start = cell
+            elif event.value == 'RELEASE' and self.start and cell:
+                self.apply_box(context, self.start, cell)
+                self.start = None
+
+        return {'RUNNING_MODAL'}
+
+    def apply_box(self, context, a, b):
+        props = context.scene.voxel_grid_props
+        lo = np.minimum(a, b)
+        hi = np.maximum(a, b) + 1
+
+        axis = {'XY': 2, 'XZ': 1, 'YZ': 0}[props.orientation]
+        hi[axis] = lo[axis] + self.depth
+
+        dims = (props.dim_x, props.dim_y, props.dim_z)
+        lo = np.clip(lo, 0, dims)
+        hi = np.clip(hi, 0, dims)
+
+        store = get_store(context)
+        if self.action == 'SELECT':
+            region = store.read_region(lo, hi)
+            for obj in context.selected_objects:
+                obj.select_set(False)
+            count = 0
+            for cell in (np.argwhere(region) + lo).tolist():
+                for obj in map(bpy.data.objects.get, store.instances.get(tuple(cell), ())):
+                    if obj:
+                        obj.select_set(True)
+                        count += 1
+            self.report({'INFO'}, f"{count} voxels selected.")
+            return
+
+        if self.action in {'COPY', 'CUT'}:
+            _clipboard["region"] = store.read_region(lo, hi)
+            if self.action == 'COPY':
+                self.report({'INFO'}, f"Copied {_clipboard['region'].shape} region.")
+                return
+
+        # Checked before filling too, so a huge box is never written only to be undone
+        if self.action == 'FILL' and too_many_instances(context, int(np.prod(hi - lo))):
+            return
+
+        delta = store.fill_box(lo, hi, 1 if self.action == 'FILL' else 0)
+        if not commit_delta(context, delta):
+            return
+        end_stroke(context)
+        self.report({'INFO'}, f"{len(delta[0])} voxels changed.")
 
     def invoke(self, context, event):
-        self.dragging = False
+        self.start = None
         context.window_manager.modal_handler_add(self)
-        self.report({'INFO'}, "Click and drag to erase voxels | ESC to cancel")
+        self.report({'INFO'}, "Drag a box on the current layer | ESC to stop")
         return {'RUNNING_MODAL'}
 
+class VOXEL_OT_paste(bpy.types.Operator):
+    """Click a cell on the current layer to paste the voxel clipboard there"""
+    bl_idname = "voxel.paste"
+    bl_label = "Paste Voxels"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return _clipboard.get("region") is not None
+
+    def modal(self, context, event):
+        if event.type in {'ESC', 'RIGHTMOUSE'}:
+            return {'CANCELLED'}
+
+        if handle_journal_keys(context, event):
+            return {'RUNNING_MODAL'}
+
+        if event.type == 'LEFTMOUSE' and event.value == 'PRESS':
+            cell = layer_cell_under_mouse(context, event, offset=0.5)
+            if cell is not None:
+                self.paste_at(context, cell)
+
+        return {'RUNNING_MODAL'}
+
+    def paste_at(self, context, cell):
+        props = context.scene.voxel_grid_props
+        lo, block = clip_block(cell, _clipboard["region"], (props.dim_x, props.dim_y, props.dim_z))
+        if block is None:
+            return
+
+        # Empty clipboard cells leave the grid untouched
+        delta = get_store(context).write_region(lo, block, block != 0)
+        if not commit_delta(context, delta):
+            return
+        end_stroke(context)
+        self.report({'INFO'}, f"{len(delta[0])} voxels pasted.")
+
+    def invoke(self, context, event):
+        context.window_manager.modal_handler_add(self)
+        self.report({'INFO'}, "Click to paste the clipboard | ESC to stop")
+        return {'RUNNING_MODAL'}
+
+class VOXEL_OT_clipboard_transform(bpy.types.Operator):
+    """Rotate the voxel clipboard by 90 degrees or mirror it"""
+    bl_idname = "voxel.clipboard_transform"
+    bl_label = "Transform Voxel Clipboard"
+    bl_options = {'REGISTER'}
+
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=[
+            ('ROTATE', "Rotate", "Rotate the clipboard 90 degrees around the axis"),
+            ('FLIP', "Flip", "Mirror the clipboard along the axis"),
+        ],
+        default='ROTATE'
+    )
+
+    axis: bpy.props.EnumProperty(
+        name="Axis",
+        items=[('X', "X", ""), ('Y', "Y", ""), ('Z', "Z", "")],
+        default='Z'
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return _clipboard.get("region") is not None
+
+    def execute(self, context):
+        region = _clipboard["region"]
+        if self.mode == 'ROTATE':
+            region = np.rot90(region, axes=ROTATE_AXES[self.axis])
+        else:
+            region = np.flip(region, axis='XYZ'.index(self.axis))
+        _clipboard["region"] = np.ascontiguousarray(region)
+        return {'FINISHED'}
+
+class VOXEL_OT_boolean(bpy.types.Operator):
+    """Combine the voxel volume with the clipboard or a collection"""
+    bl_idname = "voxel.boolean"
+    bl_label = "Voxel Boolean"
+    bl_options = {'REGISTER'}
+
+    operation: bpy.props.EnumProperty(
+        name="Operation",
+        items=[
+            ('UNION', "Union", "Add the operand to the volume"),
+            ('INTERSECT', "Intersect", "Keep only voxels inside the operand"),
+            ('DIFFERENCE', "Difference", "Remove the operand from the volume"),
+            ('XOR', "XOR", "Keep voxels inside exactly one of the two"),
+        ],
+        default='UNION'
+    )
+
+    def execute(self, context):
+        props = context.scene.voxel_grid_props
+        dims = (props.dim_x, props.dim_y, props.dim_z)
+
+        if props.boolean_operand == 'CLIPBOARD':
+            region = _clipboard.get("region")
+            if region is None:
+                self.report({'WARNING'}, "The voxel clipboard is empty.")
+                return {'CANCELLED'}
+            lo, block = clip_block(np.floor(context.scene.cursor.location).astype(int), region, dims)
+            lo, other = union_blocks([] if block is None else [(lo, block != 0)])
+        else:
+            collection = props.boolean_collection
+            if collection is None:
+                self.report({'WARNING'}, "Choose a collection for the boolean.")
+                return {'CANCELLED'}
+            lo, other = self.collection_occupancy(context, collection, dims)
+
+        # Outside the operand's box only an intersection changes anything
+        store = get_store(context)
+        delta = store.apply_boolean(lo, other, self.operation)
+        if self.operation == 'INTERSECT':
+            delta = merge_deltas([delta, store.clear_outside(lo, lo + other.shape)])
+        if not commit_delta(context, delta):
+            return {'CANCELLED'}
+        end_stroke(context)
+        self.report({'INFO'}, f"{len(delta[0])} voxels changed.")
+        return {'FINISHED'}
+
+    def collection_occupancy(self, context, collection, dims):
+        # Voxel instances count by the cell they sit in, any other mesh is voxelized
+        base = bpy.data.objects.get("VoxelBase")
+        voxels, meshes = [], []
+        for obj in collection.all_objects:
+            if base and obj.data == base.data:
+                if obj != base:
+                    voxels.append(obj.matrix_world.translation[:])
+            elif obj.type == 'MESH':
+                meshes.append(obj)
+
+        pieces = [mesh_occupancy(context, meshes, dims, context.scene.voxel_grid_props.voxelize_threshold)]
+        if voxels:
+            cells = np.floor(np.array(voxels)).astype(int)
+            cells = cells[np.all((cells >= 0) & (cells < dims), axis=1)]
+            if len(cells):
+                lo = cells.min(axis=0)
+                block = np.zeros(cells.max(axis=0) + 1 - lo, dtype=bool)
+                block[tuple((cells - lo).T)] = True
+                pieces.append((lo, block))
+        return union_blocks(pieces)
+
+class VOXEL_OT_morphology(bpy.types.Operator):
+    """Dilate, erode, open, close or hollow the voxel volume"""
+    bl_idname = "voxel.morphology"
+    bl_label = "Voxel Morphology"
+    bl_options = {'REGISTER'}
+
+    operation: bpy.props.EnumProperty(
+        name="Operation",
+        items=[
+            ('DILATE', "Dilate", "Grow the volume by Amount cells"),
+            ('ERODE', "Erode", "Shrink the volume by Amount cells"),
+            ('OPEN', "Open", "Erode then dilate, removing thin noise"),
+            ('CLOSE', "Close", "Dilate then erode, filling small gaps"),
+            ('HOLLOW', "Hollow", "Keep only a shell Amount cells thick"),
+        ],
+        default='DILATE'
+    )
+
+    amount: bpy.props.IntProperty(
+        name="Amount",
+        default=1,
+        min=1,
+        max=16,
+        description="Number of cells to grow or shrink by, or shell thickness"
+    )
+
+    neighbourhood: bpy.props.EnumProperty(
+        name="Neighbourhood",
+        items=[
+            ('FACE', "Face", "Grow through the 6 face neighbours"),
+            ('BOX', "Box", "Grow through all 26 neighbours"),
+        ],
+        default='FACE'
+    )
+
+    def execute(self, context):
+        props = context.scene.voxel_grid_props
+        passes, fn = MORPHOLOGY[self.operation]
+        box = self.neighbourhood == 'BOX'
+
+        store = get_store(context)
+        delta = store.map_occupancy(
+            (props.dim_x, props.dim_y, props.dim_z),
+            passes * self.amount,
+            lambda mask, inside: fn(mask, inside, self.amount, box)
+        )
+        if not commit_delta(context, delta):
+            return {'CANCELLED'}
+        end_stroke(context)
+        self.report({'INFO'}, f"{len(delta[0])} voxels changed.")
+        return {'FINISHED'}
+
+class VOXEL_OT_islands(bpy.types.Operator):
+    """Find connected voxel islands to report, remove small ones or split them into meshes"""
+    bl_idname = "voxel.islands"
+    bl_label = "Voxel Islands"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    action: bpy.props.EnumProperty(
+        name="Action",
+        items=[
+            ('REPORT', "Report", "Report the number and sizes of islands"),
+            ('REMOVE', "Remove Small", "Remove islands smaller than Min Size"),
+            ('SPLIT', "Split", "Move every island of at least Min Size into its own mesh object"),
+        ],
+        default='REPORT'
+    )
+
+    connectivity: bpy.props.EnumProperty(
+        name="Connectivity",
+        items=[
+            ('6', "Faces (6)", "Cells connect through shared faces"),
+            ('18', "Edges (18)", "Cells connect through shared faces or edges"),
+            ('26', "Corners (26)", "Cells connect through faces, edges or corners"),
+        ],
+        default='6'
+    )
+
+    min_size: bpy.props.IntProperty(
+        name="Min Size",
+        default=8,
+        min=1,
+        description="Islands with fewer voxels than this count as debris"
+    )
+
+    def execute(self, context):
+        store = get_store(context)
+        coords, _ = store.cells()
+        if not len(coords):
+            self.report({'WARNING'}, "No voxels to label.")
+            return {'CANCELLED'}
+
+        labels, sizes = label_components(coords, self.connectivity)
+        if self.action == 'REPORT':
+            largest = ", ".join(str(size) for size in np.sort(sizes)[::-1][:5])
+            self.report({'INFO'}, f"{len(sizes)} islands, largest: {largest}.")
+            return {'FINISHED'}
+
+        small = sizes < self.min_size
+        if self.action == 'REMOVE':
+            delta = store.set_cells(coords[small[labels]], 0)
+        elif context.scene.voxel_grid_props.compact_storage:
+            # Blender's undo can't bring back voxels kept in the compact store
+            self.report({'WARNING'}, "Split Islands needs Compact Storage turned off.")
+            return {'CANCELLED'}
+        else:
+            collection = voxel_collection(context)
+            keep = np.flatnonzero(~small)
+            order = np.argsort(labels, kind='stable')
+            bounds = np.r_[0, np.cumsum(sizes)]
+            for number, label in enumerate(keep):
+                island = coords[order[bounds[label]:bounds[label + 1]]]
+                verts, quads = surface_quads(island)
+                obj = bpy.data.objects.new(f"VoxelIsland_{number}", mesh_from_quads(f"VoxelIsland_{number}", verts, quads))
+                collection.objects.link(obj)
+            # Like Make Voxels Editable, Blender's undo removes the meshes and restores the voxels together
+            commit_delta(context, store.set_cells(coords[~small[labels]], 0), record=False)
+            self.report({'INFO'}, f"{len(keep)} islands split into meshes.")
+            return {'FINISHED'}
+
+        if not commit_delta(context, delta):
+            return {'CANCELLED'}
+        end_stroke(context)
+        self.report({'INFO'}, f"{int((~small).sum())} of {len(sizes)} islands have at least {self.min_size} voxels.")
+        return {'FINISHED'}
+
+class VOXEL_OT_generate(bpy.types.Operator):
+    """Fill the master grid with a procedural noise volume"""
+    bl_idname = "voxel.generate"
+    bl_label = "Generate Voxels"
+    bl_options = {'REGISTER'}
+
+    pattern: bpy.props.EnumProperty(
+        name="Pattern",
+        items=[
+            ('CAVES', "Caves", "Solid wherever 3D noise is above Threshold"),
+            ('TERRAIN', "Terrain", "Columns whose height follows 2D noise"),
+            ('SCATTER', "Scatter", "Random cells with the given Density"),
+        ],
+        default='CAVES'
+    )
+
+    noise: bpy.props.EnumProperty(
+        name="Noise",
+        items=[
+            ('PERLIN', "Perlin", "Smooth gradient noise"),
+            ('VALUE', "Value", "Blockier interpolated random values"),
+        ],
+        default='PERLIN'
+    )
+
+    seed: bpy.props.IntProperty(name="Seed", default=0, min=0)
+    frequency: bpy.props.FloatProperty(name="Frequency", default=0.08, min=0.001, max=1.0, precision=3)
+    octaves: bpy.props.IntProperty(name="Octaves", default=3, min=1, max=8)
+    threshold: bpy.props.FloatProperty(name="Threshold", default=0.5, min=0.0, max=1.0)
+    density: bpy.props.FloatProperty(name="Density", default=0.05, min=0.0, max=1.0)
+
+    replace: BoolProperty(
+        name="Replace",
+        default=True,
+        description="Clear grid cells the generator leaves empty"
+    )
+
+    def execute(self, context):
+        props = context.scene.voxel_grid_props
+        dims = (props.dim_x, props.dim_y, props.dim_z)
+        gradient = self.noise == 'PERLIN'
+
+        store = get_store(context)
+        deltas = []
+        for origin, hi in store.grid_blocks(dims):
+            x, y, z = (np.arange(a, b, dtype=np.float32).reshape(shape)
+                       for a, b, shape in zip(origin, hi, ((-1, 1, 1), (1, -1, 1), (1, 1, -1))))
+
+            if self.pattern == 'CAVES':
+                f = self.frequency
+                solid = fractal_noise(x * f, y * f, z * f, self.seed, gradient, self.octaves) > self.threshold
+            elif self.pattern == 'TERRAIN':
+                f = self.frequency
+                height = fractal_noise(x * f, y * f, np.zeros_like(z[..., :1]), self.seed, gradient, self.octaves)
+                solid = z < height * props.dim_z
+            else:
+                cells = [np.broadcast_to(a, tuple(hi - origin)) for a in (x, y, z)]
+                solid = lattice_hash(*cells, self.seed) < np.uint32(self.density * 0xFFFFFFFF)
+
+            solid = np.broadcast_to(solid, tuple(hi - origin))
+            deltas.append(store.write_region(origin, solid.astype(np.uint8), None if self.replace else solid))
+
+        delta = merge_deltas(deltas)
+        if not commit_delta(context, delta):
+            return {'CANCELLED'}
+        end_stroke(context)
+        self.report({'INFO'}, f"{len(delta[0])} voxels changed.")
+        return {'FINISHED'}
+
+class VOXEL_OT_automaton(bpy.types.Operator):
+    """Run a birth/survival cellular automaton over the voxel volume"""
+    bl_idname = "voxel.automaton"
+    bl_label = "Voxel Automaton"
+    bl_options = {'REGISTER'}
+
+    birth: bpy.props.StringProperty(
+        name="Birth",
+        default="14-26",
+        description="Neighbour counts (of 26) that fill an empty cell, e.g. 4,6-8"
+    )
+
+    survival: bpy.props.StringProperty(
+        name="Survival",
+        default="13-26",
+        description="Neighbour counts (of 26) that keep a filled cell"
+    )
+
+    iterations: bpy.props.IntProperty(name="Iterations", default=1, min=1, max=16)
+
+    def execute(self, context):
+        try:
+            birth = parse_rule(self.birth)
+            survival = parse_rule(self.survival)
+        except ValueError:
+            self.report({'ERROR'}, "Rules are comma separated counts or ranges between 0 and 26")
+            return {'CANCELLED'}
+
+        # Each iteration reads one more ring of neighbours around the chunk
+        props = context.scene.voxel_grid_props
+        store = get_store(context)
+        delta = store.map_occupancy(
+            (props.dim_x, props.dim_y, props.dim_z),
+            self.iterations,
+            lambda mask, inside: run_automaton(mask, inside, birth, survival, self.iterations),
+            skip_empty=not birth[0]
+        )
+        if not commit_delta(context, delta):
+            return {'CANCELLED'}
+        end_stroke(context)
+        self.report({'INFO'}, f"{len(delta[0])} voxels changed.")
+        return {'FINISHED'}
+
+class VOXEL_OT_surface(bpy.types.Operator):
+    """Extract a smooth surface mesh from the voxel volume"""
+    bl_idname = "voxel.surface"
+    bl_label = "Smooth Voxel Surface"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    passes: bpy.props.IntProperty(
+        name="Smoothing",
+        default=2,
+        min=0,
+        max=6,
+        description="Blur passes over the occupancy before extracting the surface"
+    )
+
+    iso: bpy.props.FloatProperty(
+        name="Iso Level",
+        default=0.5,
+        min=0.05,
+        max=0.95,
+        description="Blurred occupancy value the surface passes through"
+    )
+
+    def execute(self, context):
+        props = context.scene.voxel_grid_props
+        store = get_store(context)
+        verts, quads = surface_net(store, (props.dim_x, props.dim_y, props.dim_z), self.passes, self.iso)
+        if not len(quads):
+            self.report({'WARNING'}, "The voxel volume has no surface.")
+            return {'CANCELLED'}
+
+        mesh = mesh_from_quads("VoxelSurface", verts, quads)
+        mesh.polygons.foreach_set("use_smooth", np.ones(len(quads), dtype=bool))
+        obj = bpy.data.objects.new("VoxelSurface", mesh)
+        voxel_collection(context).objects.link(obj)
+        mark_scene_synced(context)
+
+        self.report({'INFO'}, f"Surface with {len(quads)} faces created.")
+        return {'FINISHED'}
+
+class VOXEL_OT_lod_preview(bpy.types.Operator):
+    """Show the volume as chunk meshes that get coarser further from the view"""
+    bl_idname = "voxel.lod_preview"
+    bl_label = "Voxel LOD Preview"
+    bl_options = {'REGISTER'}
+
+    distance: bpy.props.FloatProperty(
+        name="LOD Distance",
+        default=64.0,
+        min=1.0,
+        description="Chunks beyond this distance drop one detail level, and another each time it doubles"
+    )
+
+    reduce: bpy.props.EnumProperty(
+        name="Reduce",
+        items=[
+            ('ANY', "Any", "A coarse cell is filled if any of its 8 cells is"),
+            ('MAJORITY', "Majority", "A coarse cell is filled if at least 4 of its 8 cells are"),
+        ],
+        default='ANY'
+    )
+
+    remove: BoolProperty(name="Remove", default=False, description="Delete the preview instead of updating it")
+
+    def execute(self, context):
+        if self.remove:
+            remove_scene_collection(context.scene, 'LOD')
+            return {'FINISHED'}
+
+        collection = scene_collection(context.scene, 'LOD', "VoxelLOD")
+        eye = view_location(context)
+
+        def level_for(key):
+            center = (np.array(key) + 0.5) * CHUNK_SIZE
+            return lod_for_distance(np.linalg.norm(center - eye), self.distance)
+
+        rebuilt, shown = sync_chunk_meshes(collection, get_store(context), level_for, self.reduce)
+        mark_scene_synced(context)
+        self.report({'INFO'}, f"{rebuilt} of {shown} LOD chunks rebuilt.")
+        return {'FINISHED'}
+
+class VOXEL_OT_resample(bpy.types.Operator):
+    """Rescale the voxel model and the master grid by a factor per axis"""
+    bl_idname = "voxel.resample"
+    bl_label = "Resample Voxels"
+    bl_options = {'REGISTER'}
+
+    factor: bpy.props.FloatVectorProperty(
+        name="Factor",
+        size=3,
+        default=(2.0, 2.0, 2.0),
+        min=0.01,
+        max=64.0,
+        description="Scale factor for X, Y and Z"
+    )
+
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=[
+            ('NEAREST', "Nearest", "Copy the nearest source cell"),
+            ('MAJORITY', "Majority", "Fill a cell when most of the source cells it covers are filled"),
+            ('SMOOTH', "Smooth", "Threshold a blurred, interpolated occupancy for rounded upscaling"),
+        ],
+        default='NEAREST'
+    )
+
+    def execute(self, context):
+        props = context.scene.voxel_grid_props
+        dims = np.array((props.dim_x, props.dim_y, props.dim_z))
+        new_dims = np.maximum(np.round(dims * np.array(self.factor)).astype(np.int64), 1)
+
+        store = get_store(context)
+        values = resample_grid(store.read_region((0, 0, 0), dims), new_dims, self.mode)
+
+        # One write over both extents clears whatever the new grid no longer covers
+        extent = np.maximum(dims, new_dims)
+        padded = np.zeros(extent, dtype=np.uint8)
+        padded[tuple(slice(0, n) for n in new_dims)] = values
+        delta = store.write_region((0, 0, 0), padded)
+
+        if not commit_delta(context, delta):
+            return {'CANCELLED'}
+        set_grid_dims(context, new_dims)
+        end_stroke(context)
+
+        # Same model, so its palette still applies; its .vox position scales with it
+        offset = context.scene.get("voxel_vox_offset")
+        if offset:
+            context.scene["voxel_vox_offset"] = np.round(np.multiply(offset, new_dims / dims)).astype(np.int64).tolist()
+        self.report({'INFO'}, "Resampled to {} x {} x {}.".format(*new_dims.tolist()))
+        return {'FINISHED'}
+
+class VOXEL_OT_export_bvox(bpy.types.Operator, ExportHelper):
+    """Save the voxel volume to a compressed .bvox file"""
+    bl_idname = "voxel.export_bvox"
+    bl_label = "Export BlendVoxel (.bvox)"
+
+    filename_ext = ".bvox"
+    filter_glob: bpy.props.StringProperty(default="*.bvox", options={'HIDDEN'})
+
+    compression: bpy.props.EnumProperty(
+        name="Compression",
+        items=[
+            ('0', "Zlib", "Fast compression"),
+            ('1', "LZMA", "Smaller files, slower to save"),
+        ],
+        default='0'
+    )
+
+    def execute(self, context):
+        props = context.scene.voxel_grid_props
+        store = get_store(context)
+        with open(self.filepath, "wb") as stream:
+            write_bvox(stream, store.chunks, (props.dim_x, props.dim_y, props.dim_z), int(self.compression))
+        self.report({'INFO'}, f"Saved {store.count} voxels.")
+        return {'FINISHED'}
+
+class VOXEL_OT_import_bvox(bpy.types.Operator, ImportHelper):
+    """Load a .bvox file, replacing the voxel volume"""
+    bl_idname = "voxel.import_bvox"
+    bl_label = "Import BlendVoxel (.bvox)"
+
+    filename_ext = ".bvox"
+    filter_glob: bpy.props.StringProperty(default="*.bvox", options={'HIDDEN'})
+
+    def execute(self, context):
+        try:
+            with open(self.filepath, "rb") as stream:
+                reader = BvoxReader(stream)
+                store = load_volume(context, reader.chunks(), reader.dims)
+        except (OSError, ValueError, struct.error, zlib.error, lzma.LZMAError) as err:
+            self.report({'ERROR'}, f"Could not read {self.filepath}: {err}")
+            return {'CANCELLED'}
+        if store is None:
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Loaded {store.count} voxels.")
+        return {'FINISHED'}
+
+class VOXEL_OT_export_vox(bpy.types.Operator, ExportHelper):
+    """Save the voxel volume as a MagicaVoxel .vox file"""
+    bl_idname = "voxel.export_vox"
+    bl_label = "Export MagicaVoxel (.vox)"
+
+    filename_ext = ".vox"
+    filter_glob: bpy.props.StringProperty(default="*.vox", options={'HIDDEN'})
+
+    def execute(self, context):
+        store = get_store(context)
+        coords, values = store.cells()
+        coords += np.array(context.scene.get("voxel_vox_offset", (0, 0, 0)), dtype=np.int64)
+        with open(self.filepath, "wb") as stream:
+            write_vox(stream, coords, values, store.palette)
+        self.report({'INFO'}, f"Saved {len(coords)} voxels.")
+        return {'FINISHED'}
+
+class VOXEL_OT_import_vox(bpy.types.Operator, ImportHelper):
+    """Load a MagicaVoxel .vox file, replacing the voxel volume"""
+    bl_idname = "voxel.import_vox"
+    bl_label = "Import MagicaVoxel (.vox)"
+
+    filename_ext = ".vox"
+    filter_glob: bpy.props.StringProperty(default="*.vox", options={'HIDDEN'})
+
+    def execute(self, context):
+        try:
+            with open(self.filepath, "rb") as stream:
+                coords, values, palette = read_vox(stream.read())
+        except (OSError, ValueError, struct.error) as err:
+            self.report({'ERROR'}, f"Could not read {self.filepath}: {err}")
+            return {'CANCELLED'}
+
+        # Models left of or below the scene origin are moved into the grid; export moves them back
+        offset = np.minimum(coords.min(axis=0), 0) if len(coords) else np.zeros(3, dtype=np.int64)
+        coords -= offset
+
+        dims = coords.max(axis=0) + 1 if len(coords) else (1, 1, 1)
+        store = load_volume(context, cell_chunks(coords, values), dims)
+        if store is None:
+            return {'CANCELLED'}
+        set_scene_palette(context, palette)
+        if offset.any():
+            context.scene["voxel_vox_offset"] = offset.tolist()
+        self.report({'INFO'}, f"Loaded {store.count} voxels.")
+        return {'FINISHED'}
+
+class VOXEL_OT_export_stl(bpy.types.Operator, ExportHelper):
+    """Stream the voxel surface to a binary STL file"""
+    bl_idname = "voxel.export_stl"
+    bl_label = "Export Voxel Surface (.stl)"
+
+    filename_ext = ".stl"
+    filter_glob: bpy.props.StringProperty(default="*.stl", options={'HIDDEN'})
+
+    scale: bpy.props.FloatProperty(name="Voxel Size", default=1.0, min=0.0001, description="Edge length of one voxel in the file")
+    lod: IntProperty(name="Detail Level", default=0, min=0, max=LOD_LEVELS, description="Export 2^level coarser voxels")
+
+    def execute(self, context):
+        with open(self.filepath, "wb", buffering=1 << 20) as stream:
+            count = write_stl(stream, surface_chunks(get_store(context), self.lod), self.scale)
+        self.report({'INFO'}, f"Saved {count} triangles.")
+        return {'FINISHED'}
+
+class VOXEL_OT_export_obj(bpy.types.Operator, ExportHelper):
+    """Stream the voxel surface to an OBJ file"""
+    bl_idname = "voxel.export_obj"
+    bl_label = "Export Voxel Surface (.obj)"
+
+    filename_ext = ".obj"
+    filter_glob: bpy.props.StringProperty(default="*.obj", options={'HIDDEN'})
+
+    scale: bpy.props.FloatProperty(name="Voxel Size", default=1.0, min=0.0001, description="Edge length of one voxel in the file")
+    lod: IntProperty(name="Detail Level", default=0, min=0, max=LOD_LEVELS, description="Export 2^level coarser voxels")
+
+    def execute(self, context):
+        with open(self.filepath, "wb", buffering=1 << 20) as stream:
+            count = write_obj(stream, surface_chunks(get_store(context), self.lod), self.scale)
+        self.report({'INFO'}, f"Saved {count} faces.")
+        return {'FINISHED'}
+
+class VOXEL_OT_export_gltf(bpy.types.Operator, ExportHelper):
+    """Save the voxel volume as a single glTF binary (.glb) mesh"""
+    bl_idname = "voxel.export_gltf"
+    bl_label = "Export Voxels (.glb)"
+
+    filename_ext = ".glb"
+    filter_glob: bpy.props.StringProperty(default="*.glb", options={'HIDDEN'})
+
+    mode: bpy.props.EnumProperty(
+        name="Geometry",
+        items=[
+            ('SURFACE', "Surface", "One mesh of the outer voxel faces"),
+            ('INSTANCES', "Instanced Cubes", "One cube drawn at every voxel with EXT_mesh_gpu_instancing"),
+        ],
+        default='SURFACE'
+    )
+    scale: bpy.props.FloatProperty(name="Voxel Size", default=1.0, min=0.0001, description="Edge length of one voxel in the file")
+
+    def execute(self, context):
+        store = get_store(context)
+        if not store.count:
+            self.report({'WARNING'}, "No voxels to export.")
+            return {'CANCELLED'}
+
+        if self.mode == 'INSTANCES':
+            coords, _ = store.cells()
+            doc, blobs = gltf_document(CUBE_CORNERS * self.scale, CUBE_TRIANGLES, (coords + 0.5) * self.scale)
+        else:
+            verts, triangles, offset = [], [], 0
+            for piece, quads in surface_chunks(store):
+                verts.append(piece * self.scale)
+                triangles.append(quads[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 3) + offset)
+                offset += len(piece)
+            doc, blobs = gltf_document(np.concatenate(verts), np.concatenate(triangles))
+
+        with open(self.filepath, "wb") as stream:
+            write_glb(stream, doc, blobs)
+        self.report({'INFO'}, f"Saved {store.count} voxels.")
+        return {'FINISHED'}
+
+class VOXEL_OT_export_npy(bpy.types.Operator, ExportHelper):
+    """Save the voxel grid as a dense NumPy array (.npy)"""
+    bl_idname = "voxel.export_npy"
+    bl_label = "Export Dense Array (.npy)"
+
+    filename_ext = ".npy"
+    filter_glob: bpy.props.StringProperty(default="*.npy", options={'HIDDEN'})
+
+    occupancy: BoolProperty(name="Occupancy Only", default=False, description="Write 0/1 instead of voxel values")
+
+    def execute(self, context):
+        props = context.scene.voxel_grid_props
+        write_npy(self.filepath, get_store(context), (props.dim_x, props.dim_y, props.dim_z), self.occupancy)
+        self.report({'INFO'}, f"Saved {props.dim_x}x{props.dim_y}x{props.dim_z} grid.")
+        return {'FINISHED'}
+
+class VOXEL_OT_export_npz(bpy.types.Operator, ExportHelper):
+    """Save the filled voxels as sparse coordinates and values (.npz)"""
+    bl_idname = "voxel.export_npz"
+    bl_label = "Export Sparse Array (.npz)"
+
+    filename_ext = ".npz"
+    filter_glob: bpy.props.StringProperty(default="*.npz", options={'HIDDEN'})
+
+    def execute(self, context):
+        props = context.scene.voxel_grid_props
+        store = get_store(context)
+        write_npz(self.filepath, store, (props.dim_x, props.dim_y, props.dim_z))
+        self.report({'INFO'}, f"Saved {store.count} voxels.")
+        return {'FINISHED'}
+
+class VOXEL_OT_import_array(bpy.types.Operator, ImportHelper):
+    """Load a NumPy volume (.npy or .npz), replacing the voxel volume"""
+    bl_idname = "voxel.import_array"
+    bl_label = "Import NumPy Volume (.npy/.npz)"
+
+    filter_glob: bpy.props.StringProperty(default="*.npy;*.npz", options={'HIDDEN'})
+
+    threshold: bpy.props.FloatProperty(name="Threshold", default=0.5, description="Float arrays are filled where the value is above this")
+
+    def execute(self, context):
+        try:
+            chunks, dims = read_volume_array(self.filepath, self.threshold)
+            store = load_volume(context, chunks, dims)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as err:
+            self.report({'ERROR'}, f"Could not read {self.filepath}: {err}")
+            return {'CANCELLED'}
+        if store is None:
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Loaded {store.count} voxels.")
+        return {'FINISHED'}
+
+class VOXEL_OT_export_binvox(bpy.types.Operator, ExportHelper):
+    """Save the voxel grid as a run-length encoded .binvox file"""
+    bl_idname = "voxel.export_binvox"
+    bl_label = "Export Binvox (.binvox)"
+
+    filename_ext = ".binvox"
+    filter_glob: bpy.props.StringProperty(default="*.binvox", options={'HIDDEN'})
+
+    up_axis: bpy.props.EnumProperty(
+        name="Up Axis",
+        items=[
+            ('Y', "Y Up", "Binvox convention, Blender Z is written as binvox Y"),
+            ('Z', "Z Up", "Write the grid axes unchanged"),
+        ],
+        default='Y'
+    )
+
+    def execute(self, context):
+        props = context.scene.voxel_grid_props
+        grid = get_store(context).read_region((0, 0, 0), (props.dim_x, props.dim_y, props.dim_z))
+        with open(self.filepath, "wb") as stream:
+            write_binvox(stream, grid, self.up_axis)
+        self.report({'INFO'}, f"Saved {props.dim_x}x{props.dim_y}x{props.dim_z} grid.")
+        return {'FINISHED'}
+
+class VOXEL_OT_import_binvox(bpy.types.Operator, ImportHelper):
+    """Load a .binvox file, replacing the voxel volume"""
+    bl_idname = "voxel.import_binvox"
+    bl_label = "Import Binvox (.binvox)"
+
+    filename_ext = ".binvox"
+    filter_glob: bpy.props.StringProperty(default="*.binvox", options={'HIDDEN'})
+
+    up_axis: bpy.props.EnumProperty(
+        name="Up Axis",
+        items=[
+            ('Y', "Y Up", "Binvox convention, binvox Y becomes Blender Z"),
+            ('Z', "Z Up", "Read the grid axes unchanged"),
+        ],
+        default='Y'
+    )
+
+    def execute(self, context):
+        try:
+            with open(self.filepath, "rb") as stream:
+                grid = read_binvox(stream.read(), self.up_axis)
+        except (OSError, ValueError, UnicodeDecodeError) as err:
+            self.report({'ERROR'}, f"Could not read {self.filepath}: {err}")
+            return {'CANCELLED'}
+
+        store = load_volume(context, array_chunks(grid), grid.shape)
+        if store is None:
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Loaded {store.count} voxels.")
+        return {'FINISHED'}
+
+class VOXEL_OT_export_slices(bpy.types.Operator, ExportHelper):
+    """Save every layer of the grid as a PNG image for resin printers and laser cutters"""
+    bl_idname = "voxel.export_slices"
+    bl_label = "Export Layer Slices (.png)"
+
+    filename_ext = ".png"
+    filter_glob: bpy.props.StringProperty(default="*.png", options={'HIDDEN'})
+
+    bit_depth: bpy.props.EnumProperty(
+        name="Bit Depth",
+        items=[
+            ('1', "1 Bit", "Black and white, smallest files"),
+            ('8', "8 Bit", "Greyscale, for tools that need 8-bit images"),
+        ],
+        default='8'
+    )
+
+    def execute(self, context):
+        props = context.scene.voxel_grid_props
+        dims = (props.dim_x, props.dim_y, props.dim_z)
+        stem = os.path.splitext(self.filepath)[0]
+        count = 0
+        for layer, image in layer_slices(get_store(context), dims, props.orientation):
+            with open(f"{stem}_{layer:04d}.png", "wb") as stream:
+                stream.write(png_bytes(image, int(self.bit_depth)))
+            count += 1
+        self.report({'INFO'}, f"Saved {count} {props.orientation} slices.")
+        return {'FINISHED'}
+
+class VOXEL_OT_undo(bpy.types.Operator):
+    """Undo the last voxel stroke"""
+    bl_idname = "voxel.undo"
+    bl_label = "Undo Voxel Stroke"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        if not step_journal(context):
+            self.report({'WARNING'}, "Nothing to undo.")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class VOXEL_OT_redo(bpy.types.Operator):
+    """Redo the last undone voxel stroke"""
+    bl_idname = "voxel.redo"
+    bl_label = "Redo Voxel Stroke"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        if not step_journal(context, redo=True):
+            self.report({'WARNING'}, "Nothing to redo.")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
 class VOXEL_OT_make_real(bpy.types.Operator):
-    """Make selected voxel instances real and unique"""
+    """Bake selected voxel instances into an editable mesh without inner faces"""
     bl_idname = "voxel.make_real"
     bl_label = "Make Voxel Instances Real"
     bl_options = {'REGISTER', 'UNDO'}
 
+    per_chunk: BoolProperty(
+        name="One Mesh per Chunk",
+        default=False,
+        description="Split the baked mesh into one object per voxel chunk"
+    )
+
     def execute(self, context):
-        selected = [obj for obj in context.selected_objects if obj.name.startswith("voxel_")]
+        base = bpy.data.objects.get("VoxelBase")
+        selected = [obj for obj in context.selected_objects if base and obj.data == base.data and obj != base]
 
         if not selected:
             self.report({'WARNING'}, "No voxel instances selected.")
             return {'CANCELLED'}
 
-        # Make Instances Real
-        bpy.ops.object.duplicates_make_real()
+        # Same cells as scan_scene_voxels, so parented or constrained voxels clear their own cell
+        cells = np.floor(np.array([obj.matrix_world.translation[:] for obj in selected])).astype(np.int64)
+        if self.per_chunk:
+            pieces = [(f"VoxelMesh_{cx}_{cy}_{cz}", cells[rows])
+                      for (cx, cy, cz), rows in group_rows(cells // CHUNK_SIZE)]
+        else:
+            pieces = [("VoxelMesh", cells)]
+
+        # Faces are culled against every selected cell, so chunk seams stay closed
+        collection = voxel_collection(context)
+        baked = []
+        for name, piece in pieces:
+            verts, quads = surface_quads(piece, cells)
+            obj = bpy.data.objects.new(name, mesh_from_quads(name, verts, quads))
+            collection.objects.link(obj)
+            baked.append(obj)
+
+        # Global undo covers this operator, so keep it out of the voxel journal
+        commit_delta(context, get_store(context).set_cells(cells, 0), record=False)
 
-        # Make Single User (Object & Data)
-        bpy.ops.object.make_single_user(type='SELECTED_OBJECTS', object=True, obdata=True)
+        for obj in baked:
+            obj.select_set(True)
+        context.view_layer.objects.active = baked[0]
 
-        self.report({'INFO'}, f"{len(selected)} voxel instances made real.")
+        self.report({'INFO'}, f"{len(selected)} voxel instances baked into {len(baked)} mesh(es).")
         return {'FINISHED'}
 
 class VOXEL_OT_join_and_merge(bpy.types.Operator):
@@ -452,7 +3550,7 @@ class VOXEL_OT_voxelize_object(bpy.types.Operator):
     """Voxelize the selected object using active grid settings"""
     bl_idname = "voxel.voxelize_object"
     bl_label = "Voxelize Selected Object"
-    bl_options = {'REGISTER', 'UNDO'}
+    bl_options = {'REGISTER'}
 
     def execute(self, context):
         props = context.scene.voxel_grid_props
@@ -462,96 +3560,17 @@ class VOXEL_OT_voxelize_object(bpy.types.Operator):
             self.report({'ERROR'}, "Please select a mesh object to voxelize")
             return {'CANCELLED'}
 
-        dim_x, dim_y, dim_z = props.dim_x, props.dim_y, props.dim_z
-        orientation = props.orientation
-        voxel_size = 1.0
-        threshold = context.scene.voxel_grid_props.voxelize_threshold  # Adjust sensitivity to surface
+        dims = (props.dim_x, props.dim_y, props.dim_z)
+        lo, occupancy = mesh_occupancy(context, [obj], dims, props.voxelize_threshold)
 
-        # Get evaluated mesh
-        depsgraph = context.evaluated_depsgraph_get()
-        eval_obj = obj.evaluated_get(depsgraph)
-
-        # Extract mesh data
-        mesh = eval_obj.to_mesh()
-        mesh.transform(eval_obj.matrix_world)
-
-        from mathutils.bvhtree import BVHTree
-
-        verts = [v.co for v in mesh.vertices]
-        tris = []
-
-        for p in mesh.polygons:
-            if len(p.vertices) == 3:
-                tris.append(p.vertices)
-            elif len(p.vertices) == 4:
-                i0, i1, i2, i3 = p.vertices
-                tris.append((i0, i1, i2))
-                tris.append((i0, i2, i3))
-
-        bvh = BVHTree.FromPolygons(verts, tris)
+        delta = get_store(context).write_region(lo, occupancy.astype(np.uint8), occupancy)
+        if not commit_delta(context, delta):
+            return {'CANCELLED'}
+        end_stroke(context)
 
-        count = 0
-        for x in range(dim_x):
-            for y in range(dim_y):
-                for z in range(dim_z):
-                    # Center of each voxel (offset by 0.5)
-                    if orientation == 'XY':
-                        center = Vector((x + 0.5, y + 0.5, z + 0.5))
-                    elif orientation == 'XZ':
-                        center = Vector((x + 0.5, z + 0.5, y + 0.5))
-                    elif orientation == 'YZ':
-                        center = Vector((z + 0.5, x + 0.5, y + 0.5))
-                    else:
-                        continue  # Unknown orientation
-
-                    nearest = bvh.find_nearest(center)
-                    if nearest:
-                        _, _, _, dist = nearest
-                        if dist <= props.voxelize_threshold:
-                            self.place_voxel(context, x, y, z, orientation)
-                            count += 1
-
-        eval_obj.to_mesh_clear()
-
-        self.report({'INFO'}, f"Voxelized: {count} cubes placed.")
+        self.report({'INFO'}, f"Voxelized: {int(occupancy.sum())} cubes placed.")
         return {'FINISHED'}
 
-    def place_voxel(self, context, x, y, z, orientation):
-        pos = {
-            'XY': Vector((x + 0.5, y + 0.5, z + 0.5)),
-            'XZ': Vector((x + 0.5, z + 0.5, y + 0.5)),
-            'YZ': Vector((z + 0.5, x + 0.5, y + 0.5)),
-        }.get(orientation, Vector((x + 0.5, y + 0.5, z + 0.5)))
-
-        name = f"voxel_{x}_{y}_{z}"
-        if name in bpy.data.objects:
-            return
-
-        if "VoxelBase" not in bpy.data.objects:
-            bpy.ops.mesh.primitive_cube_add(size=1, location=(0, 0, 0))
-            base = bpy.context.active_object
-            base.name = "VoxelBase"
-            base.hide_set(True)
-            base.hide_render = True
-            base.display_type = 'WIRE'
-            base.select_set(False)
-        else:
-            base = bpy.data.objects["VoxelBase"]
-
-        inst = bpy.data.objects.new(name, base.data)
-        inst.location = pos
-
-        collection = None
-        for obj in context.selected_objects:
-            if obj.users_collection:
-                collection = obj.users_collection[0]
-                break
-
-        if collection:
-            collection.objects.link(inst)
-        else:
-            context.collection.objects.link(inst)
-
 
 # ------------------------- REGISTER ---------------------------------------
 
@@ -562,16 +3581,71 @@ classes = [
     VOXEL_OT_make_real,
     VOXEL_OT_join_and_merge,
     VOXEL_OT_erase_voxel,
+    VOXEL_OT_flood_fill,
+    VOXEL_OT_box_region,
+    VOXEL_OT_paste,
+    VOXEL_OT_clipboard_transform,
+    VOXEL_OT_boolean,
+    VOXEL_OT_morphology,
+    VOXEL_OT_islands,
+    VOXEL_OT_generate,
+    VOXEL_OT_automaton,
+    VOXEL_OT_surface,
+    VOXEL_OT_lod_preview,
+    VOXEL_OT_resample,
+    VOXEL_OT_export_bvox,
+    VOXEL_OT_import_bvox,
+    VOXEL_OT_export_vox,
+    VOXEL_OT_import_vox,
+    VOXEL_OT_export_stl,
+    VOXEL_OT_export_obj,
+    VOXEL_OT_export_gltf,
+    VOXEL_OT_export_npy,
+    VOXEL_OT_export_npz,
+    VOXEL_OT_import_array,
+    VOXEL_OT_export_binvox,
+    VOXEL_OT_import_binvox,
+    VOXEL_OT_export_slices,
+    VOXEL_OT_undo,
+    VOXEL_OT_redo,
     VOXEL_OT_voxelize_object,
 ]
 
 
+def menu_import(self, context):
+    self.layout.operator(VOXEL_OT_import_bvox.bl_idname, text="BlendVoxel (.bvox)")
+    self.layout.operator(VOXEL_OT_import_vox.bl_idname, text="MagicaVoxel (.vox)")
+    self.layout.operator(VOXEL_OT_import_array.bl_idname, text="NumPy Volume (.npy/.npz)")
+    self.layout.operator(VOXEL_OT_import_binvox.bl_idname, text="Binvox (.binvox)")
+
+
+def menu_export(self, context):
+    self.layout.operator(VOXEL_OT_export_bvox.bl_idname, text="BlendVoxel (.bvox)")
+    self.layout.operator(VOXEL_OT_export_vox.bl_idname, text="MagicaVoxel (.vox)")
+    self.layout.operator(VOXEL_OT_export_stl.bl_idname, text="Voxel Surface (.stl)")
+    self.layout.operator(VOXEL_OT_export_obj.bl_idname, text="Voxel Surface (.obj)")
+    self.layout.operator(VOXEL_OT_export_gltf.bl_idname, text="Voxels (.glb)")
+    self.layout.operator(VOXEL_OT_export_npy.bl_idname, text="Dense Array (.npy)")
+    self.layout.operator(VOXEL_OT_export_npz.bl_idname, text="Sparse Array (.npz)")
+    self.layout.operator(VOXEL_OT_export_binvox.bl_idname, text="Binvox (.binvox)")
+    self.layout.operator(VOXEL_OT_export_slices.bl_idname, text="Voxel Layer Slices (.png)")
+
+
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.voxel_grid_props = PointerProperty(type=VoxelGridProps)
+    bpy.app.handlers.load_post.append(clear_stores)
+    bpy.app.handlers.save_pre.append(save_stores)
+    bpy.types.TOPBAR_MT_file_import.append(menu_import)
+    bpy.types.TOPBAR_MT_file_export.append(menu_export)
 
 def unregister():
+    bpy.types.TOPBAR_MT_file_import.remove(menu_import)
+    bpy.types.TOPBAR_MT_file_export.remove(menu_export)
+    bpy.app.handlers.load_post.remove(clear_stores)
+    bpy.app.handlers.save_pre.remove(save_stores)
+    clear_stores(None)
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.voxel_grid_props